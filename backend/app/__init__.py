@@ -0,0 +1,24 @@
+import os
+
+
+def _load_dotenv():
+    """Load the nearest .env above this package, before any module reads its settings.
+
+    Same search as python-dotenv's `load_dotenv()`, and variables already set win; the
+    package is only imported when there is a file, which in a deployment there isn't.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+
+            load_dotenv(path)
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+_load_dotenv()
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from typing import List, Optional
+from . import crud, export, schemas
+from .cache import data_version, profile_snapshot
+from .compression import snapshot_response
+from .database import create_async_session_factory, read_url, reads_from_primary, replica_info
+from .instrumentation import ProfiledRoute
+from .responses import NDJSON_MEDIA_TYPE
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Async twins of the read endpoints in main.py. The query code is shared through
+# AsyncSession.run_sync, which runs it on the async connection without a worker thread.
+router = APIRouter(route_class=ProfiledRoute)
+
+AsyncSessionLocal = create_async_session_factory()
+_read_url = read_url()
+AsyncReadSessionLocal = (
+    create_async_session_factory(_read_url, info=replica_info(AsyncSessionLocal.kw["bind"].sync_engine))
+    if _read_url else AsyncSessionLocal
+)
+
+
+async def getReadDataBase():
+    # the same routing as main.getReadDataBase: the reader, or the primary right after a write
+    factory = AsyncSessionLocal if reads_from_primary(data_version) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
+
+
+@router.get("/profile", response_model=schemas.Profile, tags=["Profile"])
+async def readProfile(request: Request, db: AsyncSession = Depends(getReadDataBase)):
+    body = profile_snapshot.current()
+    if body is None:
+        version = data_version.value
+        body = await db.run_sync(crud.build_profile_json)
+        profile_snapshot.store(version, body)
+    return snapshot_response(request, profile_snapshot, body)
+
+
+@router.get("/skills/top", response_model=List[schemas.Skill], tags=["Skills"])
+async def get_TopSkills(db: AsyncSession = Depends(getReadDataBase)):
+    return await db.run_sync(crud.get_top_skills)
+
+
+@router.get("/skills/stats", response_model=List[schemas.SkillStats], tags=["Skills"])
+async def get_skill_stats(db: AsyncSession = Depends(getReadDataBase)):
+    return await db.run_sync(crud.get_skill_stats)
+
+
+@router.get("/skills/{skill_name}/projects", response_model=schemas.SkillProjects, tags=["Skills"])
+async def get_skill_projects(skill_name: str, db: AsyncSession = Depends(getReadDataBase)):
+    return await db.run_sync(crud.get_skill_projects, skill_name)
+
+
+@router.get("/projects", response_model=List[schemas.Project], tags=["Projects"])
+async def get_projects(response: Response, q: Optional[str] = None, db: AsyncSession = Depends(getReadDataBase), skip: int = 0, limit: int = 10,
+                       cursor: Optional[str] = None, total: bool = False):
+    projects, next_cursor, count = await db.run_sync(crud.get_projects, q, skip, limit, cursor, total)
+    crud.set_page_headers(response, next_cursor, count)
+    return projects
+
+
+@router.get("/search", tags=["Search"])
+async def search_Content(q: str, db: AsyncSession = Depends(getReadDataBase)):
+    logger.info("Search performed with query '%s'", q, extra={"query": q})
+    return await db.run_sync(crud.search_content, q)
+
+
+@router.get("/by-category/{category_name}", response_model=schemas.CategoryDetail, tags=["Categories"])
+async def get_by_category(category_name: str, db: AsyncSession = Depends(getReadDataBase)):
+    return await db.run_sync(crud.get_by_category, category_name)
+
+
+@router.get("/export", response_class=StreamingResponse, tags=["Export"])
+async def export_all(db: AsyncSession = Depends(getReadDataBase)):
+    return StreamingResponse(export.stream_async(db), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/export/{entity}", response_class=StreamingResponse, tags=["Export"])
+async def export_entity(entity: schemas.ExportEntity, db: AsyncSession = Depends(getReadDataBase)):
+    return StreamingResponse(export.stream_async(db, [entity.value]), media_type=NDJSON_MEDIA_TYPE)
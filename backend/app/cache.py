@@ -0,0 +1,194 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from sqlalchemy import event
+
+# set by the multi-worker entry point (app.serve); empty means per-process caches
+SHARED_CACHE_DIR = os.getenv("SHARED_CACHE_DIR", "")
+
+# version (int64), updated_at (float64), boot token (12 ascii bytes)
+_VERSION_LAYOUT = struct.Struct("<qd12s")
+
+
+class DataVersion:
+    """Process-wide counter bumped whenever a session commits writes.
+
+    After `share(path)` the counter lives in a memory-mapped file, so a write in one
+    worker moves the version (and the ETags) of every worker on the host.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+        self._updated_at = time.time()
+        # data seeded out of process only shows up after a restart, so tags never outlive the process
+        self._boot = uuid.uuid4().hex[:12]
+        self._shared = None
+
+    def share(self, path):
+        import fcntl
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < _VERSION_LAYOUT.size:
+            os.ftruncate(fd, _VERSION_LAYOUT.size)
+        shared = mmap.mmap(fd, _VERSION_LAYOUT.size)
+        # lockf locks belong to the process, so workers that open the same file exclude each other
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            value, updated_at, boot = _VERSION_LAYOUT.unpack_from(shared)
+            if boot.strip(b"\0"):
+                # the first process to open the file sets the token, so every worker hands out the same ETags
+                self._boot = boot.decode()
+            else:
+                _VERSION_LAYOUT.pack_into(shared, 0, self._value, self._updated_at, self._boot.encode())
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+        self._fd, self._shared = fd, shared
+
+    @property
+    def value(self):
+        if self._shared is not None:
+            return _VERSION_LAYOUT.unpack_from(self._shared)[0]
+        return self._value
+
+    @property
+    def updated_at(self):
+        if self._shared is not None:
+            return _VERSION_LAYOUT.unpack_from(self._shared)[1]
+        return self._updated_at
+
+    def bump(self):
+        with self._lock:
+            if self._shared is None:
+                self._value += 1
+                self._updated_at = time.time()
+                return
+            import fcntl
+
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                value = _VERSION_LAYOUT.unpack_from(self._shared)[0]
+                _VERSION_LAYOUT.pack_into(self._shared, 0, value + 1, time.time(), self._boot.encode())
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def etag(self):
+        return f'"{self._boot}-{self.value}"'
+
+
+data_version = DataVersion()
+
+
+class Snapshot:
+    """A pre-serialized response body, rebuilt lazily after the data version moves.
+
+    After `share(path)` a bytes body is also written to `path`, and a worker whose own
+    copy is stale loads it from there instead of rebuilding it.
+    """
+
+    def __init__(self, version=data_version):
+        self._version = version
+        self._lock = threading.Lock()
+        self._entry = (None, None, {})
+        self._path = None
+
+    def share(self, path):
+        self._path = path
+
+    def current(self):
+        built_for, body, _ = self._entry
+        version = self._version.value
+        if built_for == version:
+            return body
+        if self._path is not None:
+            return self._load(version)
+        return None
+
+    def _load(self, version):
+        try:
+            with open(self._path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        built_for, = struct.unpack_from("<q", data)
+        if built_for != version:
+            return None
+        body = data[8:]
+        self._entry = (version, body, {})
+        return body
+
+    def store(self, version, body):
+        # a write that lands mid-build leaves the version ahead of us, so the next read rebuilds
+        self._entry = (version, body, {})
+        if self._path is not None and isinstance(body, bytes):
+            # written aside and renamed, so other workers never read half a file; the name is
+            # unique per call, since threads of one worker may store at the same time
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self._path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(struct.pack("<q", version) + body)
+                os.replace(tmp, self._path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def encoded(self, body, encoding, encode):
+        """`encode(body)`, cached next to the snapshot while `body` is still the one stored."""
+        _, current, variants = self._entry
+        if current is not body:
+            return encode(body)
+        if encoding not in variants:
+            variants[encoding] = encode(body)
+        return variants[encoding]
+
+    def get(self, build):
+        body = self.current()
+        if body is not None:
+            return body
+        with self._lock:
+            body = self.current()
+            if body is None:
+                version = self._version.value
+                body = build()
+                self.store(version, body)
+            return body
+
+
+profile_snapshot = Snapshot()
+
+
+def share_across_workers(directory=SHARED_CACHE_DIR):
+    """Back the data version and the profile snapshot with files in `directory`."""
+    if not directory:
+        return False
+    data_version.share(os.path.join(directory, "data_version"))
+    profile_snapshot.share(os.path.join(directory, "profile.snapshot"))
+    return True
+
+
+def track_writes(session_factory, version=data_version):
+    """Bump `version` after any commit on `session_factory` that flushed changes."""
+
+    @event.listens_for(session_factory, "after_flush")
+    def _mark_dirty(session, flush_context):
+        session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _mark_bulk_dml(orm_execute_state):
+        # bulk insert()/update()/delete() statements bypass the flush
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _bump_on_commit(session):
+        if session.info.pop("has_writes", False):
+            version.bump()
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _clear_on_rollback(session):
+        session.info.pop("has_writes", None)
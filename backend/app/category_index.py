@@ -0,0 +1,112 @@
+import re
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from . import models, schemas
+from .cache import Snapshot, data_version
+from .database import primary_session
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+def slugify(name: str) -> str:
+    return _NON_ALNUM.sub("-", name.casefold()).strip("-")
+
+
+class CategoryIndex:
+    """Categories with their project and work experience ids resolved ahead of time.
+
+    Matching keeps the endpoint's substring semantics ("dev" finds every "... Development")
+    and also accepts slugs ("backend-and-ai"). Exact names and slugs are answered from a
+    dict; anything else is a scan over the category names, never the database.
+    """
+
+    def __init__(self, categories, skills, project_links, work_experience):
+        self.categories = categories                  # id -> schemas.Category
+        self.skills = skills                          # id -> schemas.Skill
+        self.project_categories = project_links[0]    # project id -> [category id]
+        self.project_skills = project_links[1]        # project id -> [skill id]
+        self.work_experience = work_experience        # [schemas.WorkExperience], newest first
+
+        self._names = [(id_, normalize(c.name), slugify(c.name)) for id_, c in categories.items()]
+        self.projects_by_category = defaultdict(list)
+        for project_id, category_ids in self.project_categories.items():
+            for category_id in category_ids:
+                self.projects_by_category[category_id].append(project_id)
+        self._exact = {}
+        for _, name, slug in self._names:
+            self._exact[name] = self._scan(name, slug)
+            self._exact.setdefault(slug, self._scan(name, slug))
+
+    @classmethod
+    def build(cls, db: Session):
+        categories = {c.id: schemas.Category.model_validate(c) for c in db.query(models.Category)}
+        skills = {s.id: schemas.Skill.model_validate(s) for s in db.query(models.Skill)}
+
+        project_categories, project_skills = defaultdict(list), defaultdict(list)
+        for project_id, category_id in db.execute(select(models.project_categories)):
+            project_categories[project_id].append(category_id)
+        for project_id, skill_id in db.execute(select(models.project_skills)):
+            project_skills[project_id].append(skill_id)
+
+        work_experience = [
+            schemas.WorkExperience.model_validate(w)
+            for w in db.query(models.WorkExperience)
+                       .options(selectinload(models.WorkExperience.categories))
+                       .order_by(models.WorkExperience.start_date.desc())
+        ]
+        return cls(categories, skills, (project_categories, project_skills), work_experience)
+
+    def _scan(self, name, slug):
+        return frozenset(
+            id_ for id_, category_name, category_slug in self._names
+            if name in category_name or (slug and slug in category_slug)
+        )
+
+    def match(self, query: str) -> frozenset:
+        """Ids of the categories `query` selects."""
+        name = normalize(query)
+        found = self._exact.get(name)
+        if found is None:
+            found = self._scan(name, slugify(query))
+        return found
+
+    def project_ids(self, category_ids) -> list:
+        return sorted({p for c in category_ids for p in self.projects_by_category.get(c, ())})
+
+    def work_experience_for(self, category_ids) -> list:
+        return [w for w in self.work_experience if any(c.id in category_ids for c in w.categories)]
+
+    def project(self, row) -> dict:
+        return {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "links": row.links,
+            "categories": [self.categories[c] for c in self.project_categories.get(row.id, ())],
+            "skills": [self.skills[s] for s in self.project_skills.get(row.id, ())],
+        }
+
+
+category_snapshot = Snapshot()
+
+
+def current_index(db: Session) -> CategoryIndex:
+    """The index for the current data version, rebuilt after writes.
+
+    No lock: the async routes run this inside run_sync, where blocking on a lock held by a
+    coroutine on the same thread would deadlock. Concurrent rebuilds just do the work twice.
+    """
+    index = category_snapshot.current()
+    if index is None:
+        version = data_version.value
+        with primary_session(db) as primary:
+            index = CategoryIndex.build(primary)
+        category_snapshot.store(version, index)
+    return index
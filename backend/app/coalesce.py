@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+
+from .cache import data_version
+from .compression import negotiate
+from .instrumentation import current_stats, metrics
+
+# path prefixes whose GETs are coalesced; COALESCE_ROUTES='["/profile"]' replaces the list, "[]" turns it off
+DEFAULT_ROUTES = ("/profile", "/projects", "/search", "/skills/", "/by-category/")
+
+
+def load_routes():
+    routes = json.loads(os.getenv("COALESCE_ROUTES", "null"))
+    return DEFAULT_ROUTES if routes is None else tuple(routes)
+
+
+def _copy(message):
+    # the middlewares outside rewrite response headers in place, so every replay gets its own list
+    if "headers" in message:
+        return {**message, "headers": list(message["headers"])}
+    return dict(message)
+
+
+class CoalescingMiddleware:
+    """Single-flight for identical reads: concurrent requests share one run of the endpoint.
+
+    Requests with the same path, query parameters (in any order) and negotiated encoding,
+    arriving while the data version is unchanged, wait for the first one instead of
+    running the endpoint again, then get a copy of its response. This sits inside
+    everything else, so every client still gets its own 304 check, compression,
+    rate-limit count and request id.
+    Waiting happens on the event loop, so sync endpoints don't tie up extra threads.
+    """
+
+    def __init__(self, app, routes=None, version=data_version, metrics=metrics):
+        self.app = app
+        self.routes = load_routes() if routes is None else tuple(routes)
+        self.version = version
+        self.metrics = metrics
+        self._inflight = {}
+
+    def _prefix(self, path):
+        for prefix in self.routes:
+            if path == prefix or (prefix.endswith("/") and path.startswith(prefix)):
+                return prefix
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        prefix = self._prefix(scope["path"])
+        stats = current_stats()
+        if prefix is None or (stats is not None and stats.profiler is not None):
+            # a profiled request has to run the endpoint itself
+            return await self.app(scope, receive, send)
+
+        params = tuple(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+        # /profile picks its precompressed variant itself, so the encoding is part of the answer
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        key = (scope["path"], params, encoding, self.version.value)
+        leader = self._inflight.get(key)
+        if leader is not None:
+            self.metrics.observe_coalescing(prefix, coalesced=True)
+            # shielded: a follower that disconnects must not cancel the shared result
+            messages = await asyncio.shield(leader)
+            if messages is None:
+                # the leader failed; run the request on its own
+                return await self.app(scope, receive, send)
+            for message in messages:
+                await send(_copy(message))
+            return
+
+        self.metrics.observe_coalescing(prefix, coalesced=False)
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            future.set_result(None)
+            raise
+        else:
+            future.set_result(messages)
+        finally:
+            del self._inflight[key]
+        for message in messages:
+            await send(_copy(message))
@@ -0,0 +1,146 @@
+import gzip
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "500"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# most preferred first; br is only offered when the brotli package is installed
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        # quality 10+ is an order of magnitude slower for a few percent, even for a cached variant
+        return brotli.compress(body, quality=9 if best else BROTLI_QUALITY)
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+class StreamEncoder:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+
+def negotiate(accept_encoding: str):
+    """Pick the best supported encoding from an Accept-Encoding header, or None for identity."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    # a strong ETag has to differ between the identity and the encoded representation
+    return etag[:-1] + f'-{encoding}"' if etag.endswith('"') else etag
+
+
+def base_etag(etag: str) -> str:
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def snapshot_response(request, snapshot, body: bytes, media_type: str = "application/json") -> Response:
+    """Respond with a snapshot body, reusing the compressed variant cached alongside it."""
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    headers = {"vary": "Accept-Encoding"}
+    if encoding is None or len(body) < MINIMUM_SIZE:
+        return Response(content=body, media_type=media_type, headers=headers)
+    headers["content-encoding"] = encoding
+    encoded = snapshot.encoded(body, encoding, lambda b: compress(b, encoding, best=True))
+    return Response(content=encoded, media_type=media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression above a size threshold.
+
+    Single-message bodies are compressed in one go; streamed bodies are compressed chunk
+    by chunk. Responses that already carry a Content-Encoding (precompressed snapshots)
+    pass through with only their ETag adjusted.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            if start is not None:
+                response_start, start = start, None
+                headers = MutableHeaders(scope=response_start)
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                body, more_body = message.get("body", b""), message.get("more_body", False)
+                already_encoded = headers.get("content-encoding")
+
+                if already_encoded or encoding is None or (not more_body and len(body) < self.minimum_size):
+                    if already_encoded and "etag" in headers:
+                        headers["etag"] = variant_etag(headers["etag"], already_encoded)
+                    await send(response_start)
+                    return await send(message)
+
+                headers["content-encoding"] = encoding
+                if "etag" in headers:
+                    headers["etag"] = variant_etag(headers["etag"], encoding)
+                if more_body:
+                    encoder = StreamEncoder(encoding)
+                    del headers["content-length"]
+                    await send(response_start)
+                    return await send({"type": "http.response.body", "body": encoder.compress(body), "more_body": True})
+                compressed = compress(body, encoding)
+                headers["content-length"] = str(len(compressed))
+                await send(response_start)
+                return await send({"type": "http.response.body", "body": compressed})
+
+            if encoder is None:
+                return await send(message)
+            chunk = encoder.compress(message.get("body", b""))
+            if message.get("more_body", False):
+                return await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": chunk + encoder.finish()})
+
+        await self.app(scope, receive, send_compressed)
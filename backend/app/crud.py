@@ -0,0 +1,327 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import bindparam, delete, insert, or_, select, tuple_, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import Dict, Iterable, List, Optional
+from . import models, schemas, search
+from .category_index import current_index
+from .database import primary_session
+from .skill_graph import current_graph
+
+import base64
+import binascii
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def build_profile_json(db: Session) -> bytes:
+    """The /profile body, read from the primary since it is stored as a version-keyed snapshot."""
+    with primary_session(db) as primary:
+        return _profile_json(primary)
+
+
+def _profile_json(db: Session) -> bytes:
+    profile = db.query(models.Profile).filter(models.Profile.id == 1).first()
+    if not profile:
+        logger.error("Profile with ID 1 not found in the database.")
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    education = db.query(models.Education).order_by(models.Education.start_date.desc()).all()
+    projects_orm = db.query(models.Project).options(
+        joinedload(models.Project.categories),
+        joinedload(models.Project.skills)
+    ).all()
+    skills = db.query(models.Skill).order_by(models.Skill.is_top_skill.desc(), models.Skill.name).all()
+    links = db.query(models.Link).all()
+    work_experience = db.query(models.WorkExperience).options(joinedload(models.WorkExperience.categories)).order_by(models.WorkExperience.start_date.desc()).all()
+
+    return schemas.Profile.model_validate({
+        "name": profile.name,
+        "email": profile.email,
+        "education": education,
+        "skills": skills,
+        "projects": projects_orm,
+        "work_experience": work_experience,
+        "links": links
+    }).model_dump_json().encode()
+
+
+def get_top_skills(db: Session):
+    return current_graph(db).top_skills
+
+
+def get_skill_stats(db: Session):
+    return current_graph(db).stats
+
+
+def get_skill_projects(db: Session, name: str):
+    return current_graph(db).projects_for(name)
+
+
+def encode_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int]):
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def get_projects(db: Session, q: Optional[str] = None, skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, with_total: bool = False):
+    """One page of projects plus the cursor for the next page and, on request, the total match count.
+
+    Pages are keyed on Project.id (or on bm25 rank then id for full-text matches), so
+    following `next_cursor` costs the same on page N as on page 1. `skip` is kept for
+    older clients and ignored once a cursor is given.
+    """
+    query = db.query(models.Project)
+    sort_keys = [models.Project.id]
+
+    ranked = search.ranked(query, models.Project.id, q, search.TAXONOMY_COLUMNS) if q else None
+    if ranked is not None:
+        query = ranked.order_by(None)
+        sort_keys = [search.rank, models.Project.id]
+    elif q:
+        search_query = f"%{q}%"
+        query = query.filter(
+            or_(
+                models.Project.skills.any(models.Skill.name.ilike(search_query)),
+                models.Project.categories.any(models.Category.name.ilike(search_query))
+            )
+        )
+
+    total = query.count() if with_total else None
+
+    # selectinload fetches the collections in one extra query each, so LIMIT counts projects, not joined rows
+    query = query.options(
+        selectinload(models.Project.categories),
+        selectinload(models.Project.skills)
+    ).add_columns(*sort_keys).order_by(*sort_keys)
+
+    if cursor:
+        query = query.filter(tuple_(*sort_keys) > tuple_(*decode_cursor(cursor, len(sort_keys))))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = encode_cursor(list(rows[limit - 1][1:])) if len(rows) > limit and limit > 0 else None
+    projects = schemas.projects_from_orm([row[0] for row in rows[:limit]])
+    return projects, next_cursor, total
+
+
+def search_content(db: Session, q: str):
+    if not q:
+        return {"projects": [], "skills": []}
+
+    # selectinload looks collections up by project id; a joinedload materializes the whole junction table
+    query = db.query(models.Project).options(
+        selectinload(models.Project.categories),
+        selectinload(models.Project.skills)
+    )
+    ranked = search.ranked(query, models.Project.id, q, search.TEXT_COLUMNS)
+    if ranked is None:
+        ranked = query.filter(
+            models.Project.title.ilike(f"%{q}%") | models.Project.description.ilike(f"%{q}%")
+        )
+    projects_orm = ranked.all()
+    projects = schemas.projects_from_orm(projects_orm)
+
+    skills = db.query(models.Skill).filter(models.Skill.name.ilike(f"%{q}%")).all()
+
+    return {"projects": projects, "skills": skills}
+
+
+def get_by_category(db: Session, category_name: str):
+    """Projects and work experience for the categories whose name contains `category_name`.
+
+    Matching and id resolution happen in the in-memory category index, so the only query
+    is one primary-key fetch of the matching project rows, and a miss costs none.
+    """
+    index = current_index(db)
+    category_ids = index.match(category_name)
+    project_ids = index.project_ids(category_ids)
+    work_experience = index.work_experience_for(category_ids)
+
+    if not project_ids and not work_experience:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No projects or work experience found for category: {category_name}"
+        )
+
+    projects = []
+    if project_ids:
+        # ids are ints from the index; inlining them avoids SQLite's bound-parameter limit on big categories
+        ids = bindparam("ids", project_ids, expanding=True, literal_execute=True)
+        rows = db.execute(
+            select(models.Project.id, models.Project.title, models.Project.description, models.Project.links)
+            .where(models.Project.id.in_(ids))
+            .order_by(models.Project.id)
+        )
+        projects = schemas.ProjectList.validate_python([index.project(row) for row in rows])
+
+    return {"projects": projects, "work_experience": work_experience}
+
+
+def _bulk_result(keys: List[str], ids: Dict[str, int], statuses: Dict[str, str]):
+    """Per-item results for a bulk upsert; repeated keys resolve to the last occurrence."""
+    last = {key: index for index, key in enumerate(keys)}
+    results = [
+        {"index": index, "key": key, "id": ids[key], "status": statuses[key] if last[key] == index else "duplicate"}
+        for index, key in enumerate(keys)
+    ]
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "updated", "unchanged")}
+    return {**counts, "results": results}
+
+
+def upsert(db: Session, model, rows: List[dict], key: str, update_columns=()):
+    """INSERT `rows`, settling a clash on the unique `key` in the database.
+
+    Another import can add the same key between our lookup and this statement. ON CONFLICT
+    then updates `update_columns` (or skips the row) instead of failing the request with an
+    IntegrityError. Dialects without ON CONFLICT get a plain INSERT.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        db.execute(insert(model), rows)
+        return
+    statement = dialect_insert(model)
+    if update_columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=[key], set_={column: statement.excluded[column] for column in update_columns}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[key])
+    db.execute(statement, rows)
+
+
+def resolve_names(db: Session, model, names: Iterable[str]) -> Dict[str, int]:
+    """Map names to ids with one lookup, inserting the missing ones in a single executemany."""
+    names = set(names)
+    if not names:
+        return {}
+    ids = dict(db.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+    missing = [{"name": name} for name in names if name not in ids]
+    if missing:
+        upsert(db, model, missing, "name")
+        ids.update(db.execute(select(model.name, model.id).where(model.name.in_([m["name"] for m in missing]))).all())
+    return ids
+
+
+def bulk_upsert_skills(db: Session, skills: List[schemas.SkillCreate]):
+    wanted = {skill.name: skill.is_top_skill for skill in skills}
+    existing = {name: (id_, top) for name, id_, top in db.execute(
+        select(models.Skill.name, models.Skill.id, models.Skill.is_top_skill).where(models.Skill.name.in_(wanted))
+    )}
+
+    new_rows = [{"name": name, "is_top_skill": top} for name, top in wanted.items() if name not in existing]
+    changed = [{"id": existing[name][0], "is_top_skill": top} for name, top in wanted.items()
+               if name in existing and bool(existing[name][1]) != top]
+    upsert(db, models.Skill, new_rows, "name", ("is_top_skill",))
+    if changed:
+        db.execute(update(models.Skill), changed)
+
+    statuses = {name: "created" if name not in existing else "updated" if bool(existing[name][1]) != top else "unchanged"
+                for name, top in wanted.items()}
+    ids = {name: id_ for name, (id_, _) in existing.items()}
+    if new_rows:
+        ids.update(resolve_names(db, models.Skill, [row["name"] for row in new_rows]))
+    return _bulk_result([skill.name for skill in skills], ids, statuses)
+
+
+def bulk_upsert_categories(db: Session, categories: List[schemas.CategoryCreate]):
+    names = [category.name for category in categories]
+    existing = dict(db.execute(select(models.Category.name, models.Category.id).where(models.Category.name.in_(names))).all())
+    ids = resolve_names(db, models.Category, names)
+    statuses = {name: "unchanged" if name in existing else "created" for name in names}
+    return _bulk_result(names, ids, statuses)
+
+
+def _linked_names(db: Session, junction, target, model, project_ids) -> Dict[int, set]:
+    """project id -> names linked through `junction`, in one query."""
+    names = {project_id: set() for project_id in project_ids}
+    for project_id, name in db.execute(
+        select(junction.c.project_id, model.name)
+        .join(model, model.id == junction.c[target])
+        .where(junction.c.project_id.in_(project_ids))
+    ):
+        names[project_id].add(name)
+    return names
+
+
+def bulk_upsert_projects(db: Session, projects: List[schemas.ProjectCreate]):
+    """Insert or update projects by title, replacing their skill and category links.
+
+    Skill and category names that do not exist yet are created. A project whose
+    description, links, skills and categories all match what is stored is left alone.
+    """
+    wanted = {project.title: project for project in projects}
+    existing = {title: (id_, description, links) for title, id_, description, links in db.execute(
+        select(models.Project.title, models.Project.id, models.Project.description, models.Project.links)
+        .where(models.Project.title.in_(wanted))
+    )}
+    existing_ids = [id_ for id_, _, _ in existing.values()]
+    skills = _linked_names(db, models.project_skills, "skill_id", models.Skill, existing_ids)
+    categories = _linked_names(db, models.project_categories, "category_id", models.Category, existing_ids)
+    changed = {
+        title for title, (id_, description, links) in existing.items()
+        if (description, links, skills[id_], categories[id_])
+        != (wanted[title].description, wanted[title].links, set(wanted[title].skills), set(wanted[title].categories))
+    }
+
+    new_rows = [{"title": p.title, "description": p.description, "links": p.links}
+                for title, p in wanted.items() if title not in existing]
+    upsert(db, models.Project, new_rows, "title", ("description", "links"))
+    if changed:
+        db.execute(update(models.Project), [
+            {"id": existing[title][0], "description": wanted[title].description, "links": wanted[title].links}
+            for title in changed
+        ])
+
+    ids = {title: id_ for title, (id_, _, _) in existing.items()}
+    if new_rows:
+        ids.update(db.execute(select(models.Project.title, models.Project.id).where(
+            models.Project.title.in_([row["title"] for row in new_rows])
+        )).all())
+
+    # new titles too: one that another import inserted meanwhile may already have links
+    rewritten = {title: wanted[title] for title in wanted if title not in existing or title in changed}
+    skill_ids = resolve_names(db, models.Skill, (name for p in rewritten.values() for name in p.skills))
+    category_ids = resolve_names(db, models.Category, (name for p in rewritten.values() for name in p.categories))
+
+    if rewritten:
+        rewritten_ids = [ids[title] for title in rewritten]
+        db.execute(delete(models.project_skills).where(models.project_skills.c.project_id.in_(rewritten_ids)))
+        db.execute(delete(models.project_categories).where(models.project_categories.c.project_id.in_(rewritten_ids)))
+    skill_links = [{"project_id": ids[title], "skill_id": skill_ids[name]}
+                   for title, p in rewritten.items() for name in set(p.skills)]
+    category_links = [{"project_id": ids[title], "category_id": category_ids[name]}
+                      for title, p in rewritten.items() for name in set(p.categories)]
+    if skill_links:
+        db.execute(models.project_skills.insert(), skill_links)
+    if category_links:
+        db.execute(models.project_categories.insert(), category_links)
+
+    statuses = {title: "created" if title not in existing else "updated" if title in changed else "unchanged"
+                for title in wanted}
+    return _bulk_result([project.title for project in projects], ids, statuses)
@@ -1,19 +1,193 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import time
+from urllib.parse import quote
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 Base = declarative_base()
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 
-os.makedirs(DATA_DIR, exist_ok=True)
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(DATA_DIR, 'portfolio.db')}")
 
-DATABASE_URL = f"sqlite:///{os.path.join(DATA_DIR, 'portfolio.db')}"
+# reads are served from here, e.g. a Postgres replica; unset, a SQLite file is reopened
+# read-only and any other database is read through the primary
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+# after a write, reads go to the primary for this many seconds, so a replica that lags
+# behind can't hide an admin's own changes from them, or serve old rows under the new
+# ETag; 0 always reads from the reader. A read-only SQLite file never lags, a replica may
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5" if DATABASE_READ_URL else "0"))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+# DB_ASYNC=1 serves the read endpoints from an AsyncSession instead of the threadpool
+ASYNC_DB = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0").lower() in ("1", "true", "yes")
+
+# applied to every new SQLite connection; WAL lets readers run alongside the writer
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+}
+
+# the journal mode belongs to the writer, and query_only makes SQLite refuse writes outright
+SQLITE_READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"},
+    "query_only": "ON",
+}
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+
+def _apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection, SQLITE_PRAGMAS)
+
+
+def apply_sqlite_read_pragmas(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection, SQLITE_READ_PRAGMAS)
+
+
+def is_read_only(url) -> bool:
+    return make_url(url).query.get("mode") == "ro"
+
+
+def read_url(url: str = DATABASE_URL, replica: str = DATABASE_READ_URL):
+    """Where reads are served from, or None to read through the primary."""
+    if replica:
+        return replica
+    if _is_sqlite(url) and not _is_memory(url):
+        path = quote(os.path.abspath(make_url(url).database))
+        return f"{make_url(url).drivername}:///file:{path}?mode=ro&uri=true"
+    return None
+
+
+def engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": POOL_PRE_PING, "pool_recycle": POOL_RECYCLE}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+    if not (_is_sqlite(url) and _is_memory(url)):
+        # in-memory SQLite gets a single-connection pool that takes no sizing
+        options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW)
+    return options
+
+
+def ensure_sqlite_dir(url: str):
+    """Create the directory of a SQLite database file; SQLite creates the file but not its parents."""
+    if _is_sqlite(url) and not _is_memory(url):
+        directory = os.path.dirname(os.path.abspath(make_url(url).database))
+        os.makedirs(directory, exist_ok=True)
+
+
+def _sqlite_pragmas(url):
+    return apply_sqlite_read_pragmas if is_read_only(url) else apply_sqlite_pragmas
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    if not is_read_only(url):
+        # a read-only file is opened, never created
+        ensure_sqlite_dir(url)
+    db_engine = create_engine(url, **engine_options(url))
+    if _is_sqlite(url):
+        event.listen(db_engine, "connect", _sqlite_pragmas(url))
+    return db_engine
+
+
+def pool_status(db_engine) -> dict:
+    pool = db_engine.pool
+    status = {"pool": type(pool).__name__}
+    for key, method in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout")):
+        if hasattr(pool, method):
+            status[key] = getattr(pool, method)()
+    if hasattr(pool, "overflow"):
+        # QueuePool counts overflow from -size upwards; only connections beyond the pool size matter here
+        status["overflow"] = max(pool.overflow(), 0)
+        status["max_overflow"] = pool._max_overflow
+    return status
+
+
+engine = create_db_engine()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def replica_info(primary_engine) -> dict:
+    """Session info for the reader: on a replica, which may lag, it names the primary."""
+    return {"primary": primary_engine} if DATABASE_READ_URL else {}
+
+
+@contextmanager
+def primary_session(db):
+    """`db`, or a session on the primary when `db` reads from a replica that may lag.
+
+    Version-keyed caches are built through this: they are stored under the current data
+    version, which a replica may not have caught up with. Inside `AsyncSession.run_sync`
+    the primary is the async engine's sync facade, so the build still runs on the loop.
+    """
+    primary = db.info.get("primary")
+    if primary is None:
+        yield db
+        return
+    with Session(bind=primary) as session:
+        yield session
+
+
+_read_url = read_url()
+read_engine = create_db_engine(_read_url) if _read_url else engine
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info=replica_info(engine))
+
+
+def reads_from_primary(version) -> bool:
+    """True while the last write is recent enough that the reader may not have it yet."""
+    return READ_YOUR_WRITES_SECONDS > 0 and time.time() - version.updated_at < READ_YOUR_WRITES_SECONDS
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database URL scheme '{scheme}'")
+    return ASYNC_DRIVERS[backend] + sep + rest
+
+
+def create_async_session_factory(url: str = DATABASE_URL, info=None):
+    # imported here so aiosqlite/asyncpg are only needed when async mode is on
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_url = to_async_url(url)
+    options = engine_options(url)
+    options.pop("connect_args", None)
+    async_engine = create_async_engine(async_url, **options)
+    if _is_sqlite(url):
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas(url))
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False, info=info)
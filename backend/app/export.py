@@ -0,0 +1,101 @@
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .responses import ndjson_lines
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+# export order; everything a record refers to by name comes before it
+ENTITIES = {
+    "profile": models.Profile,
+    "links": models.Link,
+    "skills": models.Skill,
+    "categories": models.Category,
+    "education": models.Education,
+    "work_experience": models.WorkExperience,
+    "projects": models.Project,
+}
+
+# entity -> {record field: (junction table, owner column, target column, target entity)};
+# related rows are written as lists of names, like the bulk endpoints take them
+RELATIONS = {
+    "work_experience": {
+        "categories": (models.work_experience_categories, "work_experience_id", "category_id", "categories"),
+    },
+    "projects": {
+        "skills": (models.project_skills, "project_id", "skill_id", "skills"),
+        "categories": (models.project_categories, "project_id", "category_id", "categories"),
+    },
+}
+
+
+def statement(entity):
+    table = ENTITIES[entity].__table__
+    return select(table).order_by(table.c.id)
+
+
+def records(db: Session, entity, rows) -> list:
+    """One batch of rows as export records, with related names fetched in one query per relation."""
+    batch = [{"type": entity, **row._mapping} for row in rows]
+    relations = RELATIONS.get(entity)
+    if relations and batch:
+        ids = [record["id"] for record in batch]
+        for field, (junction, owner, target, target_entity) in relations.items():
+            target_table = ENTITIES[target_entity].__table__
+            names = {}
+            for owner_id, name in db.execute(
+                select(junction.c[owner], target_table.c.name)
+                .join(target_table, target_table.c.id == junction.c[target])
+                .where(junction.c[owner].in_(ids))
+                .order_by(junction.c[owner], target_table.c.id)
+            ):
+                names.setdefault(owner_id, []).append(name)
+            for record in batch:
+                record[field] = names.get(record["id"], [])
+    return batch
+
+
+def begin_snapshot(db: Session):
+    """Start the read transaction an export runs in, so every query sees the same data.
+
+    pysqlite and aiosqlite only BEGIN before a write, so on SQLite it is issued by hand;
+    elsewhere REPEATABLE READ keeps one snapshot for the whole transaction.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.connection().exec_driver_sql("BEGIN")
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+def stream(db: Session, entities=tuple(ENTITIES), batch_size=EXPORT_BATCH_SIZE):
+    """NDJSON chunks for `entities`, read through a cursor `batch_size` rows at a time.
+
+    Memory stays at one batch whatever the table sizes, and everything is read in one
+    read transaction, so the export is a consistent snapshot. Closes `db` when done: the
+    request's dependency has already closed it before the body is sent, and a closed
+    Session simply starts over on its next use.
+    """
+    try:
+        begin_snapshot(db)
+        for entity in entities:
+            result = db.execute(statement(entity).execution_options(yield_per=batch_size))
+            for rows in result.partitions():
+                yield ndjson_lines(records(db, entity, rows))
+    finally:
+        db.close()
+
+
+async def stream_async(db, entities=tuple(ENTITIES), batch_size=EXPORT_BATCH_SIZE):
+    """`stream` for an AsyncSession; the per-batch work is shared through run_sync."""
+    try:
+        await db.run_sync(begin_snapshot)
+        for entity in entities:
+            result = await db.stream(statement(entity).execution_options(yield_per=batch_size))
+            async for rows in result.partitions():
+                batch = await db.run_sync(records, entity, rows)
+                yield ndjson_lines(batch)
+    finally:
+        await db.close()
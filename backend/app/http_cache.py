@@ -0,0 +1,106 @@
+import json
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .cache import data_version
+from .compression import base_etag
+
+# path prefix -> Cache-Control; HTTP_CACHE_CONTROL='{"/profile": "public, max-age=60"}' overrides entries
+DEFAULT_CACHE_CONTROL = {
+    "/profile": "public, max-age=0, must-revalidate",
+    "/projects": "public, max-age=0, must-revalidate",
+    "/skills/top": "public, max-age=0, must-revalidate",
+    "/skills/": "public, max-age=0, must-revalidate",
+    "/search": "public, max-age=0, must-revalidate",
+    "/by-category/": "public, max-age=0, must-revalidate",
+    "/export": "public, max-age=0, must-revalidate",
+    "/export/": "public, max-age=0, must-revalidate",
+}
+
+
+def load_cache_control():
+    policies = dict(DEFAULT_CACHE_CONTROL)
+    policies.update(json.loads(os.getenv("HTTP_CACHE_CONTROL", "{}")))
+    return policies
+
+
+def _matching_etag(if_none_match, etag):
+    """The client's tag that matches `etag`, or None.
+
+    If-None-Match uses weak comparison, so W/ prefixes are ignored, and a tag for a
+    compressed variant matches its identity tag.
+    """
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if base_etag(tag) == etag:
+            return tag
+    return None
+
+
+def _not_modified_since(if_modified_since, updated_at):
+    try:
+        return int(updated_at) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class HTTPCacheMiddleware:
+    """ETag / Last-Modified validators for read routes, driven by the process data version.
+
+    Conditional requests are answered with 304 here, before routing, so an unchanged
+    resource costs no database work at all.
+    """
+
+    def __init__(self, app, version=data_version, cache_control=None):
+        self.app = app
+        self.version = version
+        self.cache_control = load_cache_control() if cache_control is None else cache_control
+
+    def _policy(self, path):
+        for prefix, policy in self.cache_control.items():
+            if path == prefix or (prefix.endswith("/") and path.startswith(prefix)):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        policy = self._policy(scope["path"])
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        etag, updated_at = self.version.etag, self.version.updated_at
+        validators = {
+            "etag": etag,
+            "last-modified": formatdate(updated_at, usegmt=True),
+            "cache-control": policy,
+        }
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = request_headers.get("if-modified-since")
+        matched = _matching_etag(if_none_match, etag) if if_none_match is not None else None
+        if matched or (if_none_match is None and if_modified_since and _not_modified_since(if_modified_since, updated_at)):
+            if matched:
+                # echo the variant the client holds so its cached representation keeps its tag
+                validators["etag"] = matched
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(k.encode(), v.encode()) for k, v in validators.items()],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                for key, value in validators.items():
+                    headers[key] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
@@ -0,0 +1,310 @@
+import base64
+import binascii
+import functools
+import inspect
+import io
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from fastapi.security import HTTPBasicCredentials
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Match
+
+from . import dependencies
+from .logs import Sampler, access_logger, request_id
+
+# seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_LINES = 40
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "query_started", "profiler")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.query_started = None
+        self.profiler = None
+
+
+# set by the middleware; sync endpoints see the same object because the threadpool copies the context
+_current = ContextVar("request_stats", default=None)
+
+
+def current_stats():
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        stats.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and stats.query_started is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - stats.query_started
+        stats.query_started = None
+
+
+def track_queries(target=Engine):
+    """Count statements and time spent in the driver for the request that issued them.
+
+    Listening on the Engine class covers every engine, including the sync engine behind
+    an AsyncEngine. Statements run outside a request cost one ContextVar lookup.
+    """
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def profiled(endpoint):
+    """Run `endpoint` under the request's profiler, when one was asked for.
+
+    The wrapper runs where the endpoint runs (a worker thread for sync endpoints),
+    because cProfile only sees the thread it was enabled on.
+    """
+    if getattr(endpoint, "_profiled", False):
+        # a router's routes are rebuilt (and rewrapped) when it is included in another
+        return endpoint
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None or stats.profiler is None:
+                return await endpoint(*args, **kwargs)
+            # awaits let other tasks run on this thread, so concurrent requests leak into the report
+            stats.profiler.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                stats.profiler.disable()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            stats = _current.get()
+            if stats is None or stats.profiler is None:
+                return endpoint(*args, **kwargs)
+            stats.profiler.enable()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                stats.profiler.disable()
+    wrapper._profiled = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+class Metrics:
+    """Per-process request counters and latency histograms in Prometheus text format."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        self.requests = {}
+        self.latency = {}
+        self.queries = {}
+        self.db_seconds = {}
+        self.coalescing = {}
+
+    def observe(self, method, route, status, seconds, stats):
+        key = (method, route)
+        self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        counts = histogram[0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        histogram[1] += seconds
+        self.queries[key] = self.queries.get(key, 0) + stats.queries
+        self.db_seconds[key] = self.db_seconds.get(key, 0.0) + stats.db_time
+
+    def observe_coalescing(self, route, coalesced):
+        key = (route, "coalesced" if coalesced else "executed")
+        self.coalescing[key] = self.coalescing.get(key, 0) + 1
+
+    def render(self):
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from receiving a request to sending the last body byte.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), (counts, total) in sorted(self.latency.items()):
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {counts[-1]}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {counts[-1]}")
+
+        lines += [
+            "# HELP db_queries_total SQL statements executed while handling requests.",
+            "# TYPE db_queries_total counter",
+        ]
+        for (method, route), count in sorted(self.queries.items()):
+            lines.append(f'db_queries_total{{method="{method}",route="{route}"}} {count}')
+
+        lines += [
+            "# HELP db_query_duration_seconds_total Time spent in the database driver while handling requests.",
+            "# TYPE db_query_duration_seconds_total counter",
+        ]
+        for (method, route), seconds in sorted(self.db_seconds.items()):
+            lines.append(f'db_query_duration_seconds_total{{method="{method}",route="{route}"}} {seconds}')
+
+        lines += [
+            "# HELP http_coalesced_requests_total Coalesced reads: executed ran the endpoint, coalesced shared an identical request's result.",
+            "# TYPE http_coalesced_requests_total counter",
+        ]
+        for (route, result), count in sorted(self.coalescing.items()):
+            lines.append(f'http_coalesced_requests_total{{route="{route}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _admin_username(headers):
+    scheme, _, encoded = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Basic"})
+    try:
+        username, _, password = base64.b64decode(encoded).decode().partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials", headers={"WWW-Authenticate": "Basic"})
+    return dependencies.get_current_username(HTTPBasicCredentials(username=username, password=password))
+
+
+class InstrumentationMiddleware:
+    """Times every request, counts its queries and feeds both to `metrics` and the access log.
+
+    Adds a Server-Timing header with the total and database time, and an X-Request-ID
+    (the client's own, when it sent one). `?profile=1` from an admin (Basic auth)
+    replaces the response with a cProfile report of the endpoint.
+    """
+
+    def __init__(self, app, router, metrics=metrics, sampler=None):
+        self.app = app
+        self.router = router
+        self.metrics = metrics
+        self.sampler = Sampler() if sampler is None else sampler
+
+    def _route(self, scope):
+        # unmatched paths share one label so scanners can't blow up the label set
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if b"profile=" in scope.get("query_string", b"") and \
+                parse_qs(scope["query_string"].decode("latin-1")).get("profile") == ["1"]:
+            return await self._profile(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        rid = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        rid_token = request_id.set(rid)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = rid
+                headers.append("Server-Timing", (
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}, "
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                ))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = self._route(scope)
+            self.metrics.observe(scope["method"], route, status, elapsed, stats)
+            if self.sampler.keep(scope["path"], status) and access_logger.isEnabledFor(logging.INFO):
+                access_logger.info("%s %s %s", scope["method"], scope["path"], status, extra={
+                    "request_id": rid,
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "db_queries": stats.queries,
+                    "db_ms": round(stats.db_time * 1000, 2),
+                })
+            _current.reset(token)
+            request_id.reset(rid_token)
+
+    async def _profile(self, scope, receive, send):
+        try:
+            _admin_username(Headers(scope=scope))
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            return await response(scope, receive, send)
+
+        # only admins ever profile, so the profiler modules are loaded on first use
+        import cProfile
+        import pstats
+
+        stats = RequestStats()
+        stats.profiler = cProfile.Profile()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        report = io.StringIO()
+        report.write(
+            f"{scope['method']} {scope['path']} -> {status} in {elapsed * 1000:.1f} ms, "
+            f"{stats.queries} queries, {stats.db_time * 1000:.1f} ms in the database\n\n"
+        )
+        try:
+            pstats.Stats(stats.profiler, stream=report).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        except TypeError:
+            # nothing ran under the profiler: a 304/429 answered before routing, or no such route
+            report.write("No endpoint code was profiled.\n")
+        response = PlainTextResponse(report.getvalue(), headers={"Cache-Control": "no-store"})
+        await response(scope, receive, send)
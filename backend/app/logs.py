@@ -0,0 +1,125 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from contextvars import ContextVar
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# an empty LOG_FILE logs to stderr only
+LOG_FILE = os.getenv("LOG_FILE", "api.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# path prefix -> fraction of successful requests that get an access log line;
+# LOG_SAMPLE_RATES='{"/skills/top": 0.1}' overrides entries. Errors are always logged.
+DEFAULT_SAMPLE_RATES = {
+    "/health": 0.01,
+    "/metrics": 0.01,
+}
+
+request_id = ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("app.access")
+
+# attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_queue_handler = None
+
+
+def load_sample_rates():
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    rates.update(json.loads(os.getenv("LOG_SAMPLE_RATES", "{}")))
+    return rates
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the id of the request that logged them."""
+
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id.get()
+        return True
+
+
+class Sampler:
+    def __init__(self, rates=None):
+        self.rates = load_sample_rates() if rates is None else rates
+
+    def keep(self, path, status):
+        if status >= 400:
+            return True
+        for prefix, rate in self.rates.items():
+            if path.startswith(prefix):
+                return random.random() < rate
+        return True
+
+
+def configure_logging(level=LOG_LEVEL, filename=LOG_FILE):
+    """Route every log record through a queue to a background writer thread.
+
+    Request threads only put the record on the queue. Formatting, disk writes and
+    rotation happen on the QueueListener's thread. Calling this again does nothing.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    formatter = JSONFormatter()
+    handlers = [logging.StreamHandler()]
+    if filename:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+    return _listener
+
+
+def shutdown():
+    """Flush queued records, stop the writer thread and detach the queue from the root logger."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
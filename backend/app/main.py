@@ -1,29 +1,26 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, APIRouter, Depends, status, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from typing import List, Optional
-from . import models, schemas, dependencies
-from .database import SessionLocal
+from . import models, schemas, dependencies, crud, export, logs, warmup
+from .cache import data_version, profile_snapshot, share_across_workers, track_writes
+from .coalesce import CoalescingMiddleware
+from .database import SessionLocal, ReadSessionLocal, ASYNC_DB, engine, pool_status, read_engine, reads_from_primary
+from .compression import CompressionMiddleware, snapshot_response
+from .http_cache import HTTPCacheMiddleware
+from .instrumentation import InstrumentationMiddleware, ProfiledRoute, metrics, track_queries
+from .ratelimit import RateLimitMiddleware, create_backend
+from .responses import NDJSON_MEDIA_TYPE, FastJSONResponse
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from starlette.requests import Request
 
 import logging
-from dotenv import load_dotenv
 
-load_dotenv()
-
-import os
-print(f" Username from .env: {os.getenv('ADMIN_USERNAME')} ---")
-
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.FileHandler("api.log"), logging.StreamHandler()])
 logger = logging.getLogger(__name__)
 
-limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="ME-api")
-
 origins = [
     "http://localhost",
     "http://localhost:3000",
@@ -31,15 +28,68 @@ origins = [
     "http://127.0.0.1:8080",
     "https://vaibhav-basic-portfolio.onrender.com",
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.state.limiter = limiter
+# every endpoint can run under the ?profile=1 profiler
+router = APIRouter(route_class=ProfiledRoute)
+reads = APIRouter(route_class=ProfiledRoute)
+
+track_writes(SessionLocal)
+track_queries()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # per process: under app.serve this runs in each worker, after the fork
+    logs.configure_logging()
+    share_across_workers()
+    warmer = None
+    if warmup.WARM_POLL_SECONDS > 0:
+        # the warmer reads from the primary: it runs right after a write, which a replica may not have yet
+        warmer = asyncio.create_task(warmup.keep_warm(SessionLocal))
+    yield
+    if warmer is not None:
+        warmer.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmer
+    logs.shutdown()
+
+
+def create_app(rate_limit_backend=None) -> FastAPI:
+    """Build the application; `uvicorn --factory app.main:create_app` serves a fresh one.
+
+    Only cheap wiring happens here. Logging, the cross-worker cache files and the cache
+    warmer are started by the lifespan hook once the server starts, and the optional
+    subsystems (async sessions, non-local rate-limit storage, the profiler) are imported
+    on first use.
+    """
+    app = FastAPI(title="ME-api", default_response_class=FastJSONResponse, lifespan=lifespan)
+    app.router.route_class = ProfiledRoute
+    app.state.rate_limit_backend = create_backend() if rate_limit_backend is None else rate_limit_backend
+
+    # added before CORS so that 304 and 429 responses still carry the CORS headers;
+    # coalescing is innermost so each client still gets its own validators and encoding
+    app.add_middleware(CoalescingMiddleware)
+    app.add_middleware(HTTPCacheMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(RateLimitMiddleware, backend=app.state.rate_limit_backend)
+    app.add_middleware(InstrumentationMiddleware, router=app.router)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Request-ID"],
+    )
+
+    app.include_router(router)
+    if ASYNC_DB:
+        from .async_api import router as async_reads
+        app.include_router(async_reads)
+    else:
+        app.include_router(reads)
+    return app
+
 
 def getDataBase():
     db = SessionLocal()
@@ -48,47 +98,59 @@ def getDataBase():
     finally:
         db.close()
 
-@app.get("/health", status_code=200, tags=["Status"])
+
+def getReadDataBase():
+    # GET endpoints read from the read engine, or from the primary for a while after a write
+    db = (SessionLocal if reads_from_primary(data_version) else ReadSessionLocal)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/health", status_code=200, tags=["Status"])
 def healthCheck():
     return {"status": "ok"}
 
 
-@app.get("/profile", response_model=schemas.Profile, tags=["Profile"])
-@limiter.limit("10/minute")
-def readProfile(request: Request, db: Session = Depends(getDataBase)):
-    profile = db.query(models.Profile).filter(models.Profile.id == 1).first()
-    if not profile:
-        logger.error("Profile with ID 1 not found in the database.")
-        raise HTTPException(status_code=404, detail="Profile not found")
-
-    education = db.query(models.Education).order_by(models.Education.start_date.desc()).all()
-    projects_orm = db.query(models.Project).options(
-        joinedload(models.Project.categories), 
-        joinedload(models.Project.skills)
-    ).all()
-    skills = db.query(models.Skill).order_by(models.Skill.is_top_skill.desc(), models.Skill.name).all()
-    links = db.query(models.Link).all()
-    work_experience = db.query(models.WorkExperience).options(joinedload(models.WorkExperience.categories)).order_by(models.WorkExperience.start_date.desc()).all()
-    projects = [schemas.Project.from_orm_with_json(p) for p in projects_orm]
-
-    return {
-        "name": profile.name,
-        "email": profile.email,
-        "education": education,
-        "skills": skills,
-        "projects": projects,
-        "work_experience": work_experience,
-        "links": links   
-    }
-
-
-@app.get("/skills/top", response_model=List[schemas.Skill], tags=["Skills"])
-def get_TopSkills(db: Session = Depends(getDataBase)):
-    top_skills = db.query(models.Skill).filter(models.Skill.is_top_skill == True).all()
-    return top_skills
-
-
-@app.post("/skills", response_model=schemas.Skill, status_code=status.HTTP_201_CREATED, tags=["Skills"])
+@router.get("/health/db", tags=["Status"])
+def databaseHealthCheck():
+    # read the pool counters before the ping checks a connection out
+    pool = pool_status(engine)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    health = {"status": "ok", "dialect": engine.dialect.name, **pool}
+    if read_engine is not engine:
+        health["reader"] = {"dialect": read_engine.dialect.name, **pool_status(read_engine)}
+    return health
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Status"])
+def readMetrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@reads.get("/profile", response_model=schemas.Profile, tags=["Profile"])
+def readProfile(request: Request, db: Session = Depends(getReadDataBase)):
+    body = profile_snapshot.get(lambda: crud.build_profile_json(db))
+    return snapshot_response(request, profile_snapshot, body)
+
+
+@reads.get("/skills/top", response_model=List[schemas.Skill], tags=["Skills"])
+def get_TopSkills(db: Session = Depends(getReadDataBase)):
+    return crud.get_top_skills(db)
+
+
+@reads.get("/skills/stats", response_model=List[schemas.SkillStats], tags=["Skills"])
+def get_skill_stats(db: Session = Depends(getReadDataBase)):
+    return crud.get_skill_stats(db)
+
+
+@reads.get("/skills/{skill_name}/projects", response_model=schemas.SkillProjects, tags=["Skills"])
+def get_skill_projects(skill_name: str, db: Session = Depends(getReadDataBase)):
+    return crud.get_skill_projects(db, skill_name)
+
+
+@router.post("/skills", response_model=schemas.Skill, status_code=status.HTTP_201_CREATED, tags=["Skills"])
 def create_skill(skill: schemas.SkillCreate, db: Session = Depends(getDataBase), username: str = Depends(dependencies.get_current_username)):
     db_skill = models.Skill(**skill.model_dump())
     db.add(db_skill)
@@ -97,70 +159,56 @@ def create_skill(skill: schemas.SkillCreate, db: Session = Depends(getDataBase),
     return db_skill
 
 
-@app.get("/projects", response_model=List[schemas.Project], tags=["Projects"])
-def get_projects(q: Optional[str] = None, db: Session = Depends(getDataBase), skip: int = 0, limit: int = 10):
+@router.post("/skills/bulk", response_model=schemas.BulkResult, tags=["Skills"])
+def create_skills_bulk(skills: List[schemas.SkillCreate], db: Session = Depends(getDataBase), username: str = Depends(dependencies.get_current_username)):
+    result = crud.bulk_upsert_skills(db, skills)
+    db.commit()
+    return result
 
-    query = db.query(models.Project).options(
-        joinedload(models.Project.categories), 
-        joinedload(models.Project.skills)
-    )
-    
-    if q:
-        search_query = f"%{q}%"
-        query = query.join(models.project_skills, isouter=True).join(models.Skill, isouter=True) \
-                     .join(models.project_categories, isouter=True).join(models.Category, isouter=True) \
-                     .filter(
-                         or_(
-                             models.Skill.name.ilike(search_query),
-                             models.Category.name.ilike(search_query)
-                         )
-                     ).distinct()
-
-    projects_orm = query.order_by(models.Project.id).offset(skip).limit(limit).all()
-    projects = [schemas.Project.from_orm_with_json(p) for p in projects_orm]
+
+@router.post("/categories/bulk", response_model=schemas.BulkResult, tags=["Categories"])
+def create_categories_bulk(categories: List[schemas.CategoryCreate], db: Session = Depends(getDataBase), username: str = Depends(dependencies.get_current_username)):
+    result = crud.bulk_upsert_categories(db, categories)
+    db.commit()
+    return result
+
+
+@router.post("/projects/bulk", response_model=schemas.BulkResult, tags=["Projects"])
+def create_projects_bulk(projects: List[schemas.ProjectCreate], db: Session = Depends(getDataBase), username: str = Depends(dependencies.get_current_username)):
+    result = crud.bulk_upsert_projects(db, projects)
+    db.commit()
+    return result
+
+
+@reads.get("/projects", response_model=List[schemas.Project], tags=["Projects"])
+def get_projects(response: Response, q: Optional[str] = None, db: Session = Depends(getReadDataBase), skip: int = 0, limit: int = 10,
+                 cursor: Optional[str] = None, total: bool = False):
+    projects, next_cursor, count = crud.get_projects(db, q, skip, limit, cursor, total)
+    crud.set_page_headers(response, next_cursor, count)
     return projects
 
 
-@app.get("/search", tags=["Search"])
-def search_Content(q: str, db: Session = Depends(getDataBase)):
-    logger.info(f"Search performed with query '{q}'")
-    if not q:
-        return {"projects": [], "skills": []}
-
-    projects_orm = db.query(models.Project).options(
-        joinedload(models.Project.categories),
-        joinedload(models.Project.skills) 
-    ).filter(
-        models.Project.title.ilike(f"%{q}%") | models.Project.description.ilike(f"%{q}%")
-    ).all()
-    projects = [schemas.Project.from_orm_with_json(p) for p in projects_orm]
-    
-    skills = db.query(models.Skill).filter(models.Skill.name.ilike(f"%{q}%")).all()
-    
-    return {"projects": projects, "skills": skills}
-
-
-@app.get("/by-category/{category_name}", response_model=schemas.CategoryDetail, tags=["Categories"])
-def get_by_category(category_name: str, db: Session = Depends(getDataBase)):
-    projects_orm = db.query(models.Project) \
-        .options(joinedload(models.Project.categories), joinedload(models.Project.skills)) \
-        .join(models.project_categories).join(models.Category) \
-        .filter(models.Category.name.ilike(f"%{category_name}%")) \
-        .all()
-    
-    projects = [schemas.Project.from_orm_with_json(p) for p in projects_orm]
-
-    work_experience = db.query(models.WorkExperience) \
-        .options(joinedload(models.WorkExperience.categories)) \
-        .join(models.work_experience_categories).join(models.Category) \
-        .filter(models.Category.name.ilike(f"%{category_name}%")) \
-        .order_by(models.WorkExperience.start_date.desc()) \
-        .all()
-
-    if not projects and not work_experience:
-        raise HTTPException(
-            status_code=404, 
-            detail=f"No projects or work experience found for category: {category_name}"
-        )
-
-    return {"projects": projects, "work_experience": work_experience}
\ No newline at end of file
+@reads.get("/search", tags=["Search"])
+def search_Content(q: str, db: Session = Depends(getReadDataBase)):
+    logger.info("Search performed with query '%s'", q, extra={"query": q})
+    return crud.search_content(db, q)
+
+
+@reads.get("/by-category/{category_name}", response_model=schemas.CategoryDetail, tags=["Categories"])
+def get_by_category(category_name: str, db: Session = Depends(getReadDataBase)):
+    return crud.get_by_category(db, category_name)
+
+
+
+@reads.get("/export", response_class=StreamingResponse, tags=["Export"])
+def export_all(db: Session = Depends(getReadDataBase)):
+    return StreamingResponse(export.stream(db), media_type=NDJSON_MEDIA_TYPE)
+
+
+@reads.get("/export/{entity}", response_class=StreamingResponse, tags=["Export"])
+def export_entity(entity: schemas.ExportEntity, db: Session = Depends(getReadDataBase)):
+    return StreamingResponse(export.stream(db, [entity.value]), media_type=NDJSON_MEDIA_TYPE)
+
+
+app = create_app()
+rate_limit_backend = app.state.rate_limit_backend
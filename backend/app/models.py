@@ -1,22 +1,26 @@
 from sqlalchemy import (
-    Boolean, Column, Integer, String, Text, Date, ForeignKey, Table
+    Boolean, Column, Integer, String, Text, Date, ForeignKey, Index, Table, JSON
 )
 from sqlalchemy.orm import relationship
 from .database import Base
 
 project_categories = Table('project_categories', Base.metadata,
     Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # the primary key leads with the owning side; these serve the category -> rows direction
+    Index('ix_project_categories_category_id', 'category_id')
 )
 
 work_experience_categories = Table('work_experience_categories', Base.metadata,
     Column('work_experience_id', Integer, ForeignKey('work_experience.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    Index('ix_work_experience_categories_category_id', 'category_id')
 )
 
 project_skills = Table('project_skills', Base.metadata,
     Column('project_id', Integer, ForeignKey('projects.id'), primary_key=True),
-    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True)
+    Column('skill_id', Integer, ForeignKey('skills.id'), primary_key=True),
+    Index('ix_project_skills_skill_id', 'skill_id')
 )
 
 class Profile(Base):
@@ -30,7 +34,7 @@ class Skill(Base):
     __tablename__ = 'skills'
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
-    is_top_skill = Column(Boolean, default=False)
+    is_top_skill = Column(Boolean, default=False, index=True)
     
     projects = relationship('Project', secondary=project_skills, back_populates='skills')
 
@@ -38,9 +42,11 @@ class Skill(Base):
 class Project(Base):
     __tablename__ = 'projects'
     id = Column(Integer, primary_key=True)
-    title = Column(String, nullable=False)
+    # the bulk endpoint upserts by title
+    title = Column(String, nullable=False, unique=True)
     description = Column(Text, nullable=False)
-    links = Column(Text)
+    # stored as TEXT; decoded once when the row is loaded instead of on every serialization
+    links = Column(JSON)
     
     categories = relationship('Category', secondary=project_categories, back_populates='projects')
     skills = relationship('Skill', secondary=project_skills, back_populates='projects')
@@ -51,7 +57,7 @@ class WorkExperience(Base):
     id = Column(Integer, primary_key=True)
     company = Column(String, nullable=False)
     position = Column(String, nullable=False)
-    start_date = Column(Date, nullable=False)
+    start_date = Column(Date, nullable=False, index=True)
     end_date = Column(Date)
     description = Column(Text)
 
@@ -63,7 +69,7 @@ class Education(Base):
     id = Column(Integer, primary_key=True)
     institution = Column(String, nullable=False)
     degree = Column(String, nullable=False)
-    start_date = Column(String, nullable=False)
+    start_date = Column(String, nullable=False, index=True)
     end_date = Column(String)
 
 
@@ -80,4 +86,8 @@ class Category(Base):
     name = Column(String, nullable=False, unique=True)
 
     projects = relationship('Project', secondary=project_categories, back_populates='categories')
-    work_experiences = relationship('WorkExperience', secondary=work_experience_categories, back_populates='categories')
\ No newline at end of file
+    work_experiences = relationship('WorkExperience', secondary=work_experience_categories, back_populates='categories')
+
+    __table_args__ = (
+        Index('ix_categories_name_nocase', name.collate('NOCASE')),
+    )
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from starlette.responses import JSONResponse
+
+# path prefix -> limit; RATE_LIMITS='{"/search": "60/minute"}' overrides entries, "" disables one
+DEFAULT_LIMITS = {
+    "/profile": "10/minute",
+    "/search": "30/minute",
+    "/by-category/": "30/minute",
+    "/projects": "60/minute",
+    "/skills/top": "60/minute",
+    # a full export reads every table
+    "/export": "6/minute",
+    "/export/": "30/minute",
+}
+
+# memory:// counts per process; sqlite:///path is shared by every worker on the host;
+# redis://, memcached:// and other limits storage URIs are shared across hosts
+STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE", "memory://")
+
+
+GRANULARITIES = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+_LIMIT = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+
+
+class Limit(NamedTuple):
+    """`amount` requests per `multiples` `granularity`; quacks like a `limits` RateLimitItem."""
+
+    amount: int
+    multiples: int
+    granularity: str
+
+    def get_expiry(self):
+        return self.multiples * GRANULARITIES[self.granularity]
+
+    def __str__(self):
+        return f"{self.amount} per {self.multiples} {self.granularity}"
+
+
+def parse(value):
+    """Parse "10/minute", "30 per hour" or "5/2 seconds" without importing `limits`.
+
+    Importing `limits` loads every storage backend it supports, which is a noticeable part
+    of a cold start; anything this doesn't understand still goes to `limits.parse`.
+    """
+    match = _LIMIT.match(value)
+    if match is None:
+        from limits import parse as parse_limit
+        return parse_limit(value)
+    amount, multiples, granularity = match.groups()
+    return Limit(int(amount), int(multiples or 1), granularity.lower())
+
+
+def load_limits():
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(json.loads(os.getenv("RATE_LIMITS", "{}")))
+    return {prefix: parse(value) for prefix, value in limits.items() if value}
+
+
+class LocalFixedWindow:
+    """In-process fixed-window counters: a dict lookup per request, no locks or I/O.
+
+    Only touched from the event loop thread, so plain dict updates are safe.
+    """
+
+    SWEEP_EVERY = 10_000
+
+    def __init__(self):
+        self._windows = {}
+        self._hits = 0
+
+    async def hit(self, key, limit):
+        now = time.time()
+        expiry = limit.get_expiry()
+        window_start = now - now % expiry
+        start, count = self._windows.get(key, (window_start, 0))
+        if start != window_start:
+            count = 0
+        count += 1
+        self._windows[key] = (window_start, count)
+        self._hits += 1
+        if self._hits % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+        return count, window_start + expiry
+
+    def _sweep(self, now):
+        # longest configured window is well under a day, so anything older is dead
+        self._windows = {k: v for k, v in self._windows.items() if v[0] > now - 86400}
+
+    def reset(self):
+        self._windows.clear()
+
+
+class SQLiteFixedWindow:
+    """Fixed-window counters in a SQLite file, shared by all workers on one host.
+
+    Each hit is a single upsert, so concurrent workers never lose increments. It runs on a
+    worker thread, so waiting for another worker's write lock never stalls the event loop,
+    and a hit that can't get the lock within BUSY_TIMEOUT_MS is let through uncounted.
+    """
+
+    BUSY_TIMEOUT_MS = 100
+    # seconds between deletes of expired windows, which would otherwise pile up per client
+    PRUNE_EVERY = 60
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._next_prune = 0.0
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(f"PRAGMA busy_timeout={self.BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    async def hit(self, key, limit):
+        return await asyncio.to_thread(self._hit, key, limit)
+
+    def _hit(self, key, limit):
+        now = time.time()
+        expiry = limit.get_expiry()
+        window_end = now - now % expiry + expiry
+        conn = self._connection()
+        try:
+            count, = conn.execute(
+                """INSERT INTO rate_limits (key, count, expires_at) VALUES (?, 1, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       count = CASE WHEN expires_at <= ? THEN 1 ELSE count + 1 END,
+                       expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+                   RETURNING count""",
+                (key, window_end, now, now),
+            ).fetchone()
+            if now >= self._next_prune:
+                self._next_prune = now + self.PRUNE_EVERY
+                conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            # fail open: a request let through beats one stuck behind a lock
+            return 0, window_end
+        return count, window_end
+
+    def reset(self):
+        self._connection().execute("DELETE FROM rate_limits")
+
+    def after_fork(self):
+        # a sqlite3 connection must not be used by two processes
+        self._local = threading.local()
+
+
+class StorageFixedWindow:
+    """Fixed window on a `limits` async storage (redis, memcached, ...).
+
+    async+memory:// stands in for a Redis URL in tests.
+    """
+
+    def __init__(self, uri):
+        from limits.storage import storage_from_string
+
+        # the async variants keep the network round trip off the event loop thread
+        self.storage = storage_from_string(uri if uri.startswith("async+") else "async+" + uri)
+
+    async def hit(self, key, limit):
+        count = await self.storage.incr(key, limit.get_expiry())
+        return count, await self.storage.get_expiry(key)
+
+
+def create_backend(uri=STORAGE_URI):
+    if uri == "memory://":
+        return LocalFixedWindow()
+    if uri.startswith("sqlite:///"):
+        return SQLiteFixedWindow(uri[len("sqlite:///"):])
+    return StorageFixedWindow(uri)
+
+
+class RateLimitMiddleware:
+    """Per-route, per-client request limits checked before routing."""
+
+    def __init__(self, app, backend=None, limits=None):
+        self.app = app
+        self.backend = create_backend() if backend is None else backend
+        self.limits = load_limits() if limits is None else limits
+
+    def _limit(self, path):
+        for prefix, limit in self.limits.items():
+            if path == prefix or (prefix.endswith("/") and path.startswith(prefix)):
+                return prefix, limit
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        prefix, limit = self._limit(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        client = scope.get("client")
+        key = f"{client[0] if client else '-'}:{prefix}:{limit.amount}/{limit.get_expiry()}"
+        count, reset_at = await self.backend.hit(key, limit)
+        if count <= limit.amount:
+            return await self.app(scope, receive, send)
+
+        retry_after = max(int(reset_at - time.time()), 1)
+        response = JSONResponse(
+            {"error": f"Rate limit exceeded: {limit}"},
+            status_code=429,
+            headers={
+                "Retry-After": str(retry_after),
+                "X-RateLimit-Limit": str(limit.amount),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(reset_at)),
+            },
+        )
+        await response(scope, receive, send)
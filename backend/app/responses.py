@@ -0,0 +1,32 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_lines(records) -> bytes:
+    """Newline-terminated JSON objects, one per record; dates are written as ISO strings."""
+    out = bytearray()
+    # appended one at a time: orjson's results keep spare capacity, so a list of them costs far more than the text
+    if orjson is not None:
+        for record in records:
+            out += orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    else:
+        for record in records:
+            out += json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+    return bytes(out)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed, compact stdlib json otherwise."""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
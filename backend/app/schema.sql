@@ -23,7 +23,7 @@ create table skills (
 
 create table projects(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
+    title TEXT NOT NULL UNIQUE,
     description TEXT NOT NULL,
     links TEXT
 );
@@ -78,4 +78,15 @@ create table project_skills (
     PRIMARY KEY (project_id, skill_id),
     FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
     FOREIGN KEY (skill_id) REFERENCES skills (id) ON DELETE CASCADE
-);
\ No newline at end of file
+);
+-- reverse lookups: the junction primary keys only cover the project / work experience side
+create index ix_project_skills_skill_id on project_skills (skill_id);
+create index ix_project_categories_category_id on project_categories (category_id);
+create index ix_work_experience_categories_category_id on work_experience_categories (category_id);
+
+create index ix_skills_is_top_skill on skills (is_top_skill);
+create index ix_work_experience_start_date on work_experience (start_date);
+create index ix_education_start_date on education (start_date);
+
+-- case-insensitive exact-name lookups: WHERE name = ? COLLATE NOCASE
+create index ix_categories_name_nocase on categories (name COLLATE NOCASE);
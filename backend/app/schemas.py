@@ -1,7 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter, field_validator
 from typing import List, Optional, Dict
 from datetime import date
-import json
+from enum import Enum
 
 class ProjectLinks(BaseModel):
     github: Optional[str] = None
@@ -62,15 +62,18 @@ class Project(ProjectBase):
 
     class Config:
         from_attributes = True
-    
-    @staticmethod
-    def from_orm_with_json(project_orm):
-        project_dict = project_orm.__dict__
-        if project_orm.links:
-            project_dict['links'] = json.loads(project_orm.links)
-        else:
-            project_dict['links'] = {}
-        return Project.model_validate(project_dict)
+
+    @field_validator("links", mode="before")
+    @classmethod
+    def links_or_empty(cls, links):
+        return links or {}
+
+
+ProjectList = TypeAdapter(List[Project])
+
+def projects_from_orm(projects_orm) -> List[Project]:
+    # one pydantic-core pass over the whole result set, reading ORM attributes in place
+    return ProjectList.validate_python(projects_orm, from_attributes=True)
 
 
 class WorkExperience(WorkExperienceBase):
@@ -102,6 +105,48 @@ class CategoryDetail(BaseModel):
     projects: List[Project]
     work_experience: List[WorkExperience]
 
+class SkillStats(Skill):
+    project_count: int
+
+class SkillProject(BaseModel):
+    id: int
+    title: str
+    skills: List[str]
+
+class SkillProjects(BaseModel):
+    skill: Skill
+    projects: List[SkillProject]
+
 class SkillCreate(BaseModel):
     name: str
-    is_top_skill: bool = False
\ No newline at end of file
+    is_top_skill: bool = False
+
+class CategoryCreate(CategoryBase):
+    pass
+
+class ProjectCreate(ProjectBase):
+    links: Optional[Dict[str, str]] = None
+    skills: List[str] = []
+    categories: List[str] = []
+
+class BulkItemResult(BaseModel):
+    index: int
+    key: str
+    id: int
+    status: str
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    results: List[BulkItemResult]
+
+
+class ExportEntity(str, Enum):
+    profile = "profile"
+    links = "links"
+    skills = "skills"
+    categories = "categories"
+    education = "education"
+    work_experience = "work_experience"
+    projects = "projects"
@@ -0,0 +1,138 @@
+import os
+import re
+import sqlite3
+import threading
+
+from sqlalchemy import column, literal_column, table
+
+FTS_TABLE = "project_search"
+TEXT_COLUMNS = ("title", "description")
+TAXONOMY_COLUMNS = ("skills", "categories")
+
+# '+', '#' and '.' are kept inside tokens so C++, C# and .NET stay searchable
+_TOKEN = re.compile(r"[\w+#.]+")
+
+enabled = os.getenv("SEARCH_FTS", "1") != "0"
+
+# FTS5's hidden `rank` column is bm25() unless configured otherwise
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+rank = _fts.c.rank
+
+_availability = {}
+_lock = threading.Lock()
+
+
+def _reindex(where):
+    return f"""
+    DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT id FROM projects p WHERE {where});
+    INSERT INTO {FTS_TABLE} (rowid, title, description, skills, categories)
+    SELECT p.id, p.title, p.description,
+        (SELECT group_concat(s.name, ' ') FROM project_skills ps JOIN skills s ON s.id = ps.skill_id WHERE ps.project_id = p.id),
+        (SELECT group_concat(c.name, ' ') FROM project_categories pc JOIN categories c ON c.id = pc.category_id WHERE pc.project_id = p.id)
+    FROM projects p WHERE {where};"""
+
+
+FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, description, skills, categories,
+    tokenize = "unicode61 tokenchars '+#.'"
+);
+
+CREATE TRIGGER IF NOT EXISTS projects_search_ai AFTER INSERT ON projects BEGIN
+    {_reindex("p.id = NEW.id")}
+END;
+CREATE TRIGGER IF NOT EXISTS projects_search_au AFTER UPDATE ON projects BEGIN
+    DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+    {_reindex("p.id = NEW.id")}
+END;
+CREATE TRIGGER IF NOT EXISTS projects_search_ad AFTER DELETE ON projects BEGIN
+    DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS project_skills_search_ai AFTER INSERT ON project_skills BEGIN
+    {_reindex("p.id = NEW.project_id")}
+END;
+CREATE TRIGGER IF NOT EXISTS project_skills_search_ad AFTER DELETE ON project_skills BEGIN
+    {_reindex("p.id = OLD.project_id")}
+END;
+CREATE TRIGGER IF NOT EXISTS project_categories_search_ai AFTER INSERT ON project_categories BEGIN
+    {_reindex("p.id = NEW.project_id")}
+END;
+CREATE TRIGGER IF NOT EXISTS project_categories_search_ad AFTER DELETE ON project_categories BEGIN
+    {_reindex("p.id = OLD.project_id")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS skills_search_au AFTER UPDATE OF name ON skills BEGIN
+    {_reindex("p.id IN (SELECT project_id FROM project_skills WHERE skill_id = NEW.id)")}
+END;
+CREATE TRIGGER IF NOT EXISTS categories_search_au AFTER UPDATE OF name ON categories BEGIN
+    {_reindex("p.id IN (SELECT project_id FROM project_categories WHERE category_id = NEW.id)")}
+END;
+"""
+
+
+def install(conn, rebuild=False):
+    """Create the FTS5 table and its sync triggers on a raw sqlite3 connection.
+
+    Returns False when the SQLite build has no FTS5 module.
+    """
+    try:
+        if rebuild:
+            conn.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone()
+        conn.executescript(FTS_SCHEMA)
+        if not exists:
+            conn.executescript(_reindex("1 = 1"))
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        conn.rollback()
+        return False
+
+
+def _raw_connection(engine):
+    # aiosqlite hides the sqlite3 connection behind its own thread, and a read-only engine
+    # can't run DDL, so both install the index through a plain connection to the same file
+    if engine.dialect.is_async or engine.url.query.get("mode") == "ro":
+        return sqlite3.connect(engine.url.database, uri=engine.url.query.get("uri") == "true")
+    return engine.raw_connection()
+
+
+def ensure_index(engine):
+    if not enabled or engine.dialect.name != "sqlite":
+        return False
+    if engine in _availability:
+        return _availability[engine]
+    with _lock:
+        if engine not in _availability:
+            conn = _raw_connection(engine)
+            try:
+                _availability[engine] = install(conn)
+            finally:
+                conn.close()
+    return _availability[engine]
+
+
+def match_expression(q, columns):
+    tokens = _TOKEN.findall(q.lower())
+    if not tokens:
+        return None
+    terms = " ".join('"%s"*' % token.replace('"', '""') for token in tokens)
+    return "{%s} : (%s)" % (" ".join(columns), terms)
+
+
+def ranked(query, id_column, q, columns):
+    """Restrict `query` to rows matching `q` in `columns`, best bm25 rank first.
+
+    Returns None when the caller should fall back to LIKE scans.
+    """
+    expression = match_expression(q, columns)
+    if expression is None or not ensure_index(query.session.get_bind()):
+        return None
+    return query.join(_fts, _fts.c.rowid == id_column) \
+                .filter(literal_column(FTS_TABLE).match(expression)) \
+                .order_by(rank)
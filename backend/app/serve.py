@@ -0,0 +1,141 @@
+"""Production entry point: import the app once, then fork uvicorn workers that share its socket.
+
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4
+
+Workers inherit the imported app, so imports happen once and the loaded modules are
+shared copy-on-write; each worker then runs the app's lifespan hook (logging, shared
+cache files) for itself. A write in any worker moves the data version of all of them
+(through a memory-mapped counter in a shared directory) and the /profile snapshot is
+built once and read back from a file by the others. Dead workers are replaced.
+"""
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+
+
+def worker_defaults(workers, shared_dir, environ=os.environ):
+    """Settings that only make sense for one process, switched to multi-worker defaults.
+
+    Rate limits are counted in a SQLite file in the shared directory, so N workers don't
+    allow N times the limit, and the rotating log file is turned off, since several
+    processes rotating one file lose records. Values set explicitly are kept.
+    """
+    if workers > 1:
+        environ.setdefault("RATE_LIMIT_STORAGE", f"sqlite:///{os.path.join(shared_dir, 'rate_limits.db')}")
+        environ.setdefault("LOG_FILE", "")
+
+
+def _after_fork():
+    from . import database, main
+
+    # pooled connections opened before the fork belong to the parent
+    database.engine.dispose(close=False)
+    database.read_engine.dispose(close=False)
+    if database.ASYNC_DB:
+        from .async_api import AsyncReadSessionLocal, AsyncSessionLocal
+        AsyncSessionLocal.kw["bind"].sync_engine.dispose(close=False)
+        AsyncReadSessionLocal.kw["bind"].sync_engine.dispose(close=False)
+    after_fork = getattr(main.rate_limit_backend, "after_fork", None)
+    if after_fork is not None:
+        after_fork()
+
+
+def _spawn(config, sock):
+    pid = os.fork()
+    if pid:
+        return pid
+    import uvicorn
+    from . import logs
+
+    code = 0
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _after_fork()
+        uvicorn.Server(config).run(sockets=[sock])
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        logs.shutdown()
+        # never return into the supervisor's frames (and its cleanup)
+        os._exit(code)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="per worker; further connections get 503")
+    args = parser.parse_args(argv)
+
+    shared_dir = tempfile.mkdtemp(prefix="me-api-")
+    os.environ["SHARED_CACHE_DIR"] = shared_dir
+    # before the app is imported: both settings are read at import
+    worker_defaults(args.workers, shared_dir)
+    started = time.perf_counter()
+
+    import uvicorn
+    from .main import app
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(args.backlog)
+    sock.set_inheritable(True)
+
+    config = uvicorn.Config(app, access_log=False, limit_concurrency=args.limit_concurrency,
+                            backlog=args.backlog, log_config=None)
+    print(f"app loaded in {(time.perf_counter() - started) * 1000:.0f} ms; "
+          f"starting {args.workers} workers on {args.host}:{args.port}", file=sys.stderr)
+
+    workers = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        for _ in range(args.workers):
+            workers[_spawn(config, sock)] = time.monotonic()
+        while workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            spawned_at = workers.pop(pid, None)
+            if stopping or spawned_at is None:
+                continue
+            print(f"worker {pid} exited with status {status}; restarting", file=sys.stderr)
+            if time.monotonic() - spawned_at < 1:
+                # a worker that dies on startup would otherwise be respawned in a tight loop
+                time.sleep(1)
+            workers[_spawn(config, sock)] = time.monotonic()
+    finally:
+        sock.close()
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
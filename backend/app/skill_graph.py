@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .cache import Snapshot, data_version
+from .category_index import normalize
+from .database import primary_session
+
+
+class SkillGraph:
+    """Skills and the projects that use them, with the adjacency resolved both ways.
+
+    Answers /skills/top, /skills/stats and /skills/{name}/projects without a query. Only
+    project ids and titles are held, so the graph stays small next to /profile.
+    """
+
+    def __init__(self, skills, titles, edges):
+        self.skills = skills                            # id -> schemas.Skill, by id
+        self.titles = titles                            # project id -> title
+        self.projects_by_skill = defaultdict(list)      # skill id -> [project id]
+        self.skills_by_project = defaultdict(list)      # project id -> [skill id]
+        for project_id, skill_id in sorted(edges):
+            self.projects_by_skill[skill_id].append(project_id)
+            self.skills_by_project[project_id].append(skill_id)
+
+        self._by_name = {normalize(skill.name): id_ for id_, skill in skills.items()}
+        self.top_skills = [skill for skill in skills.values() if skill.is_top_skill]
+        self.stats = sorted(
+            (schemas.SkillStats(**skill.model_dump(), project_count=len(self.projects_by_skill.get(id_, ())))
+             for id_, skill in skills.items()),
+            key=lambda stat: (-stat.project_count, stat.name),
+        )
+
+    @classmethod
+    def build(cls, db: Session):
+        skills = {s.id: schemas.Skill.model_validate(s) for s in db.query(models.Skill).order_by(models.Skill.id)}
+        titles = dict(db.execute(select(models.Project.id, models.Project.title)).all())
+        edges = db.execute(select(models.project_skills)).all()
+        return cls(skills, titles, edges)
+
+    def projects_for(self, name: str) -> schemas.SkillProjects:
+        skill_id = self._by_name.get(normalize(name))
+        if skill_id is None:
+            raise HTTPException(status_code=404, detail=f"Skill '{name}' not found")
+        return schemas.SkillProjects(skill=self.skills[skill_id], projects=[
+            schemas.SkillProject(
+                id=project_id,
+                title=self.titles[project_id],
+                skills=[self.skills[s].name for s in self.skills_by_project[project_id]],
+            )
+            for project_id in self.projects_by_skill.get(skill_id, ())
+        ])
+
+
+skill_graph_snapshot = Snapshot()
+
+
+def current_graph(db: Session) -> SkillGraph:
+    """The graph for the current data version; normally already built by the warmer."""
+    graph = skill_graph_snapshot.current()
+    if graph is None:
+        graph = rebuild(db)
+    return graph
+
+
+def rebuild(db: Session) -> SkillGraph:
+    version = data_version.value
+    with primary_session(db) as primary:
+        graph = SkillGraph.build(primary)
+    skill_graph_snapshot.store(version, graph)
+    return graph
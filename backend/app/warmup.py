@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import os
+import time
+
+from fastapi import HTTPException
+
+from . import crud, skill_graph
+from .cache import data_version, profile_snapshot
+from .category_index import current_index
+
+# how often the warmer checks the data version; 0 turns background warming off
+WARM_POLL_SECONDS = float(os.getenv("CACHE_WARM_POLL_SECONDS", "1"))
+# the skill graph is also rebuilt this often without a write, for changes made outside the app
+WARM_REFRESH_SECONDS = float(os.getenv("CACHE_WARM_REFRESH_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+def warm(session_factory, refresh=False):
+    """Build whichever version-keyed caches are stale, so requests find them ready."""
+    with session_factory() as db:
+        if refresh:
+            skill_graph.rebuild(db)
+        else:
+            skill_graph.current_graph(db)
+        current_index(db)
+        try:
+            profile_snapshot.get(lambda: crud.build_profile_json(db))
+        except HTTPException:
+            # no profile row yet (an unseeded database): /profile answers 404 until a write adds one
+            pass
+
+
+async def keep_warm(session_factory, poll=WARM_POLL_SECONDS, refresh=WARM_REFRESH_SECONDS):
+    """Rewarm after every write (in any worker) and on the refresh interval, until cancelled.
+
+    The builds run on a worker thread. A request that arrives before they finish builds
+    what it needs itself, as it would without the warmer.
+    """
+    seen, failed, refreshed = None, None, time.monotonic()
+    while True:
+        version = data_version.value
+        due = refresh > 0 and time.monotonic() - refreshed >= refresh
+        if version != seen or due:
+            try:
+                await asyncio.to_thread(warm, session_factory, due)
+                seen = version
+                if due:
+                    refreshed = time.monotonic()
+            except Exception:
+                # retried on every poll, but logged once per data version
+                if version != failed:
+                    logger.exception("Cache warming failed")
+                    failed = version
+        await asyncio.sleep(poll)
@@ -0,0 +1,302 @@
+"""Latency, throughput and allocations for every endpoint, at several catalog sizes.
+
+Each scale gets its own synthetic database (see dataset.py). Endpoints are driven
+in-process through TestClient and over a real socket against a uvicorn subprocess, and
+the results can be saved as a JSON baseline and compared against on a later commit.
+
+Run from the backend directory:
+    python benchmarks/bench_endpoints.py --scales 10,10000,100000 --save benchmarks/baseline.json
+    python benchmarks/bench_endpoints.py --compare benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from dataset import BACKEND, NO_RATE_LIMITS, build_database
+
+os.environ["RATE_LIMITS"] = NO_RATE_LIMITS
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import data_version
+from app import warmup
+from app.database import create_db_engine, read_url
+from app.dependencies import ADMIN_PASSWORD, ADMIN_USERNAME
+from app.main import app, getDataBase, getReadDataBase
+
+_skill_names = itertools.count()
+
+# name -> (method, path, keyword arguments for the client call)
+ENDPOINTS = {
+    "GET /profile": ("GET", "/profile", lambda: {}),
+    "GET /projects": ("GET", "/projects", lambda: {}),
+    "GET /projects?q=": ("GET", "/projects", lambda: {"params": {"q": "python"}}),
+    "GET /search": ("GET", "/search", lambda: {"params": {"q": "topic77 retrieval"}}),
+    "GET /by-category": ("GET", "/by-category/QuantFinance", lambda: {}),
+    # runs last: every write moves the data version and throws away the /profile snapshot
+    "POST /skills": ("POST", "/skills", lambda: {
+        "json": {"name": f"bench-skill-{next(_skill_names)}", "is_top_skill": False},
+        "auth": (ADMIN_USERNAME, ADMIN_PASSWORD),
+    }),
+}
+
+
+def summarize(latencies, wall, allocations=None):
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "rps": round(len(latencies) / wall, 1),
+        "alloc_kib": None if allocations is None else round(statistics.mean(allocations) / 1024, 1),
+    }
+
+
+def drive(call, requests, concurrency=1):
+    """Run `call` `requests` times on `concurrency` threads; returns per-request ms and the wall time."""
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        call().raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        latencies = [one(i) for i in range(requests)]
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(one, range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def allocations(call, samples):
+    """Peak bytes allocated while handling each request, traced across all threads."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call().raise_for_status()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def bench_in_process(path, args):
+    engine = create_db_engine(f"sqlite:///{path}")
+    read_engine = create_db_engine(read_url(f"sqlite:///{path}"))
+
+    def session(bind):
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+
+        def override():
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+        return override
+
+    app.dependency_overrides[getDataBase] = session(engine)
+    app.dependency_overrides[getReadDataBase] = session(read_engine)
+    # the lifespan's warmer reads the app's own database, not this scale's
+    warmup.WARM_POLL_SECONDS = 0
+    # the /profile snapshot from the previous scale must not be served for this one
+    data_version.bump()
+    results = {}
+    try:
+        with TestClient(app) as client:
+            for name, (method, url, kwargs) in ENDPOINTS.items():
+                call = lambda: client.request(method, url, **kwargs())
+                for _ in range(args.warmup):
+                    call()
+                latencies, wall = drive(call, args.requests)
+                results[name] = summarize(latencies, wall, allocations(call, args.alloc_samples))
+    finally:
+        app.dependency_overrides.pop(getDataBase, None)
+        app.dependency_overrides.pop(getReadDataBase, None)
+        read_engine.dispose()
+        engine.dispose()
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _memory_kib(pid):
+    """Resident and proportional set size of a process; PSS splits pages shared with other workers."""
+    sizes = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    sizes[key.lower() + "_kib"] = int(value.split()[0])
+    except OSError:
+        return {"rss_kib": None, "pss_kib": None}
+    return sizes
+
+
+def _worker_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()] or [pid]
+    except OSError:
+        return [pid]
+
+
+def bench_socket(path, args):
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{path}", RATE_LIMITS=NO_RATE_LIMITS, LOG_FILE="",
+               ADMIN_USERNAME=ADMIN_USERNAME, ADMIN_PASSWORD=ADMIN_PASSWORD)
+    if args.workers:
+        command = [sys.executable, "-m", "app.serve", "--port", str(port), "--workers", str(args.workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--no-access-log"]
+    launched = time.perf_counter()
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = httpx.Client(base_url=base_url, timeout=60)
+        return local.client
+
+    results = {}
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                client().get("/health").raise_for_status()
+                break
+            except httpx.TransportError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.02)
+        startup_ms = round((time.perf_counter() - launched) * 1000, 1)
+        for name, (method, url, kwargs) in ENDPOINTS.items():
+            call = lambda: client().request(method, url, **kwargs())
+            for _ in range(args.warmup):
+                call()
+            latencies, wall = drive(call, args.requests, args.concurrency)
+            results[name] = summarize(latencies, wall)
+        # measured after the load, once every worker has built its caches
+        results["startup"] = {
+            "startup_ms": startup_ms,
+            "workers": [_memory_kib(pid) for pid in _worker_pids(server.pid)],
+        }
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """Names of measurements whose p50 or p95 got slower than the baseline by more than `tolerance`."""
+    regressions = []
+    for key, current in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if "p50_ms" not in current:
+            continue
+        for stat in ("p50_ms", "p95_ms"):
+            # sub-millisecond jitter is noise, not a regression
+            if current[stat] > before[stat] * (1 + tolerance) and current[stat] - before[stat] > floor_ms:
+                regressions.append(f"{key} {stat}: {before[stat]:.2f} -> {current[stat]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="10,10000,100000", help="comma-separated project counts")
+    parser.add_argument("--modes", default="inprocess,socket")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads in socket mode")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="socket mode: run app.serve with this many workers instead of a single uvicorn")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--floor-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # request logging to the console would dominate the small endpoints
+    logging.getLogger().setLevel(logging.WARNING)
+    modes = {"inprocess": bench_in_process, "socket": bench_socket}
+    results = {}
+    print(f"{'mode/scale/endpoint':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'KiB/req':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (int(s) for s in args.scales.split(",")):
+            path = os.path.join(tmp, f"bench-{scale}.db")
+            build_database(path, scale)
+            for mode in args.modes.split(","):
+                for name, stats in modes[mode](path, args).items():
+                    key = f"{mode}/{scale}/{name}"
+                    results[key] = stats
+                    if name == "startup":
+                        workers = ", ".join(f"{w['rss_kib']}/{w['pss_kib']}" for w in stats["workers"])
+                        print(f"{key:<40}ready in {stats['startup_ms']:.0f} ms; worker RSS/PSS KiB: {workers}")
+                        continue
+                    alloc = "-" if stats["alloc_kib"] is None else f"{stats['alloc_kib']:.1f}"
+                    print(f"{key:<40}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                          f"{stats['p99_ms']:>10.2f}{stats['rps']:>10.1f}{alloc:>10}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "workers": args.workers,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance, args.floor_ms)
+        print(f"compared with {args.compare} (commit {baseline.get('commit')}): "
+              f"{len(regressions) or 'no'} regression(s)")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
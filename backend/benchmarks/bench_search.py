@@ -0,0 +1,92 @@
+"""Compare FTS5 and LIKE latency for /search and /projects?q= on a synthetic catalog.
+
+Run from the backend directory:
+    python benchmarks/bench_search.py --projects 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, or_
+from sqlalchemy.orm import sessionmaker
+
+from app import models, search
+from app.main import app, getDataBase, getReadDataBase
+from dataset import NO_RATE_LIMITS, build_database
+
+QUERIES = [
+    ("/search", "topic1234"), ("/search", "topic77 retrieval"), ("/search", "backtest"),
+    ("/projects", "python"), ("/projects", "quant"),
+]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def like_ids(db, q):
+    return db.query(models.Project.id).filter(
+        or_(models.Project.title.ilike(f"%{q}%"), models.Project.description.ilike(f"%{q}%"))
+    ).all()
+
+
+def fts_ids(db, q):
+    return search.ranked(db.query(models.Project.id), models.Project.id, q, search.TEXT_COLUMNS).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        build_database(path, args.projects)
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        def override():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[getDataBase] = override
+        app.dependency_overrides[getReadDataBase] = override
+        os.environ["RATE_LIMITS"] = NO_RATE_LIMITS
+        client = TestClient(app)
+        print(f"{args.projects} projects, median of {args.repeat} runs")
+        print(f"{'matching only':<28}{'LIKE ms':>10}{'FTS5 ms':>10}")
+        with SessionLocal() as db:
+            for _, q in QUERIES:
+                like = timed(lambda: like_ids(db, q), args.repeat)
+                fts = timed(lambda: fts_ids(db, q), args.repeat)
+                print(f"{q:<28}{like:>10.2f}{fts:>10.2f}")
+
+        print(f"{'full request':<28}{'LIKE ms':>10}{'FTS5 ms':>10}")
+        for path, q in QUERIES:
+            request = lambda: client.get(path, params={"q": q}).raise_for_status()
+            search.enabled = False
+            like = timed(request, args.repeat)
+            search.enabled = True
+            fts = timed(request, args.repeat)
+            print(f"{path + '?q=' + q:<28}{like:>10.2f}{fts:>10.2f}")
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
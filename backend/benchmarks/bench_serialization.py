@@ -0,0 +1,79 @@
+"""Serialization time and bytes-on-wire for project payloads, before and after the fast JSON
+response class and compression.
+
+Run from the backend directory:
+    python benchmarks/bench_serialization.py --projects 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import schemas
+from app.compression import ENCODINGS, compress
+from app.responses import FastJSONResponse, orjson
+
+WORDS = ('navigation anchors firebase backend retrieval chatbot scraper vector database pipeline '
+         'controller timers publishers engine options backtesting strategy scripting analysis').split()
+
+
+def make_projects(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        schemas.Project(
+            id=i,
+            title=" ".join(rng.choices(WORDS, k=4)).title(),
+            description=" ".join(rng.choices(WORDS, k=60)),
+            links={"github": f"https://github.com/example/{i}"},
+            categories=[schemas.Category(id=c, name=f"Category {c}") for c in rng.sample(range(1, 8), 2)],
+            skills=[schemas.Skill(id=s, name=f"Skill {s}", is_top_skill=s < 5) for s in rng.sample(range(1, 20), 3)],
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    projects = make_projects(args.projects)
+    print(f"{args.projects} projects, median of {args.repeat} runs, orjson {'on' if orjson else 'off (stdlib fallback)'}")
+
+    encoded = jsonable_encoder(projects)
+    before_ms, body = timed(lambda: JSONResponse(jsonable_encoder(projects)).body, args.repeat)
+    after_ms, fast_body = timed(lambda: FastJSONResponse(jsonable_encoder(projects)).body, args.repeat)
+    render_before, _ = timed(lambda: JSONResponse(encoded).body, args.repeat)
+    render_after, _ = timed(lambda: FastJSONResponse(encoded).body, args.repeat)
+    print(f"{'serialization':<32}{'before ms':>12}{'after ms':>12}")
+    print(f"{'encode + render':<32}{before_ms:>12.2f}{after_ms:>12.2f}")
+    print(f"{'render only':<32}{render_before:>12.2f}{render_after:>12.2f}")
+
+    print(f"{'bytes on wire':<32}{'bytes':>12}{'ms':>12}")
+    print(f"{'identity (before)':<32}{len(body):>12}{'':>12}")
+    for encoding in ENCODINGS:
+        for best in (False, True):
+            ms, data = timed(lambda: compress(fast_body, encoding, best=best), args.repeat)
+            label = f"{encoding} ({'precompressed' if best else 'on the fly'})"
+            print(f"{label:<32}{len(data):>12}{ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Cold-start cost: what importing the app costs, and how long until it first answers.
+
+Two measurements, each in fresh interpreters:
+
+- import: `python -X importtime -c "import app.main"`, summed per top-level package so
+  the expensive dependencies stand out (median of --runs).
+- first response: start uvicorn in a subprocess and time from spawn until the first
+  answer to each of --paths, asked in order (median of --runs).
+
+--cold points the bytecode cache at an empty directory and disables writing it, so every
+module is compiled from source: a container image built without .pyc files.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --cold --runs 3
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from dataset import BACKEND, NO_RATE_LIMITS
+
+import httpx
+
+
+def interpreter_env(cold, cache_dir):
+    env = dict(os.environ, RATE_LIMITS=NO_RATE_LIMITS, LOG_FILE="")
+    if cold:
+        env.update(PYTHONPYCACHEPREFIX=cache_dir, PYTHONDONTWRITEBYTECODE="1")
+    return env
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(module, env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = parse_importtime(result.stderr)
+    packages = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        top = name.split(".")[0]
+        packages[name if top == "app" else top] += self_us
+    return wall_ms, modules[module][1] / 1000, {name: us / 1000 for name, us in packages.items()}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_response(paths, env, timeout=60):
+    """ms from spawning uvicorn to the first answer for each path, asked one after another."""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    timings = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            for path in paths:
+                while True:
+                    if server.poll() is not None:
+                        raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+                    if time.perf_counter() - started > timeout:
+                        raise TimeoutError(f"no answer on {path} after {timeout}s")
+                    try:
+                        client.get(path).raise_for_status()
+                        break
+                    except httpx.TransportError:
+                        time.sleep(0.005)
+                timings[path] = (time.perf_counter() - started) * 1000
+    finally:
+        server.terminate()
+        server.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--paths", default="/health,/profile")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="packages listed by import time")
+    parser.add_argument("--cold", action="store_true", help="compile every module from source")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    paths = args.paths.split(",")
+
+    walls, totals, packages, responses = [], [], defaultdict(list), defaultdict(list)
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = interpreter_env(args.cold, cache_dir)
+            wall, total, per_package = measure_import(args.module, env)
+        walls.append(wall)
+        totals.append(total)
+        for name, ms in per_package.items():
+            packages[name].append(ms)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for path, ms in measure_first_response(paths, interpreter_env(args.cold, cache_dir)).items():
+                responses[path].append(ms)
+
+    results = {
+        "cold": args.cold,
+        "runs": args.runs,
+        "interpreter_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(totals), 1),
+        "packages_ms": {
+            name: round(statistics.median(values), 1)
+            for name, values in sorted(packages.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+        },
+        "first_response_ms": {path: round(statistics.median(values), 1) for path, values in responses.items()},
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'cold' if args.cold else 'warm'} bytecode cache, median of {args.runs} runs")
+    print(f"  python -c 'import {args.module}'   {results['interpreter_ms']:8.1f} ms wall")
+    print(f"  import {args.module} (importtime)  {results['import_ms']:8.1f} ms")
+    for name, ms in results["packages_ms"].items():
+        print(f"    {name:<30} {ms:8.1f} ms")
+    print("  uvicorn spawn -> first response")
+    for path, ms in results["first_response_ms"].items():
+        print(f"    {path:<30} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Synthetic portfolio databases and shared settings for the benchmarks.
+
+The real seed (profile, links, education, work experience, 19 skills, 7 categories and
+4 projects) is loaded first, then synthetic projects are added with the same fan-out as
+the seeded ones: two to four skills and one or two categories each.
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from app import search, seed
+from app.ratelimit import DEFAULT_LIMITS
+
+SCHEMA = os.path.join(BACKEND, "app", "schema.sql")
+
+SKILLS = ['Python', 'C++', 'C#', 'Unity', 'Unreal Engine', 'CMake', 'SQL', '.NET', 'AWS', 'Firebase',
+          'Git', 'Perforce', 'ASP.NET', 'ARCore', 'OpenXR', 'ROS2', 'SQLite', 'ChromaDB', 'Langchain']
+CATEGORIES = ['AR/VR Development', '.NET Development', 'Game Development', 'Backend and AI',
+              'Cloud Computing', 'QuantFinance', 'General']
+WORDS = ('navigation anchors firebase backend retrieval chatbot scraper vector database pipeline '
+         'controller timers publishers engine options backtesting strategy scripting analysis '
+         'interactive modules workflow automation assets immersive render shader physics').split()
+# a long tail of rarer terms so that most queries are selective, as they are on a real catalog
+VOCABULARY = WORDS + [f"topic{i}" for i in range(5000)]
+SEEDED_PROJECTS = 4
+
+# RATE_LIMITS value that switches every per-route limit off, so benchmarks measure the endpoints
+NO_RATE_LIMITS = json.dumps({prefix: "" for prefix in DEFAULT_LIMITS})
+
+
+def build_database(path, n_projects, seed_value=7):
+    """Create a database at `path` holding the seed data plus synthetic projects, `n_projects` in all."""
+    rng = random.Random(seed_value)
+    conn = sqlite3.connect(path)
+    try:
+        with open(SCHEMA) as f:
+            conn.executescript(f.read())
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed.seed_data(conn)
+
+        first = SEEDED_PROJECTS + 1
+        last = max(n_projects, SEEDED_PROJECTS)
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO projects (title, description, links) VALUES (?, ?, ?)",
+            # titles are unique, as the schema requires; the index keeps random picks from colliding
+            [(f"{' '.join(rng.choices(WORDS, k=4)).title()} {i}", " ".join(rng.choices(VOCABULARY, k=60)),
+              json.dumps({"github": f"https://github.com/example/{i}"})) for i in range(first, last + 1)],
+        )
+        cursor.executemany(
+            "INSERT INTO project_skills (project_id, skill_id) VALUES (?, ?)",
+            [(p, s) for p in range(first, last + 1) for s in rng.sample(range(1, len(SKILLS) + 1), rng.randint(2, 4))],
+        )
+        cursor.executemany(
+            "INSERT INTO project_categories (project_id, category_id) VALUES (?, ?)",
+            [(p, c) for p in range(first, last + 1) for c in rng.sample(range(1, len(CATEGORIES) + 1), rng.randint(1, 2))],
+        )
+        conn.commit()
+        search.install(conn, rebuild=True)
+    finally:
+        conn.close()
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app import search
+from app.cache import data_version, track_writes
+from app.database import ASYNC_DB, create_async_session_factory, create_db_engine, read_url
+from app.dependencies import ADMIN_PASSWORD, ADMIN_USERNAME
+from app.main import app, getDataBase, getReadDataBase, rate_limit_backend
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "schema.sql")
+
+ADMIN_AUTH = (ADMIN_USERNAME, ADMIN_PASSWORD)
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    rate_limit_backend.reset()
+
+
+@pytest.fixture
+def empty_db(tmp_path):
+    """Point the app at a fresh, empty database for tests that write."""
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+    search.install(conn)
+    conn.close()
+
+    engine = create_db_engine(f"sqlite:///{path}")
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    track_writes(factory)
+    # reads go through a read-only connection to the same file, like the app's own
+    read_engine = create_db_engine(read_url(f"sqlite:///{path}"))
+    read_factory = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+    def session(session_factory):
+        def override():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+        return override
+
+    # snapshots and the category index are keyed on the data version, not on the database
+    data_version.bump()
+    app.dependency_overrides[getDataBase] = session(factory)
+    app.dependency_overrides[getReadDataBase] = session(read_factory)
+    if ASYNC_DB:
+        # DB_ASYNC=1 serves the reads from the async router instead
+        from app import async_api
+
+        async_read_factory = create_async_session_factory(read_url(f"sqlite:///{path}"))
+
+        async def async_session():
+            async with async_read_factory() as db:
+                yield db
+
+        app.dependency_overrides[async_api.getReadDataBase] = async_session
+    yield factory
+    app.dependency_overrides.pop(getDataBase, None)
+    app.dependency_overrides.pop(getReadDataBase, None)
+    data_version.bump()
+    if ASYNC_DB:
+        app.dependency_overrides.pop(async_api.getReadDataBase, None)
+        asyncio.run(async_read_factory.kw["bind"].dispose())
+    read_engine.dispose()
+    engine.dispose()
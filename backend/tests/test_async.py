@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import async_api
+from app.database import to_async_url
+from app.main import app
+
+async_app = FastAPI()
+async_app.include_router(async_api.router)
+
+sync_client = TestClient(app)
+async_client = TestClient(async_app)
+
+
+def test_to_async_url_picks_async_driver():
+    assert to_async_url("sqlite:///data/portfolio.db") == "sqlite+aiosqlite:///data/portfolio.db"
+    assert to_async_url("postgresql://u:p@db/me") == "postgresql+asyncpg://u:p@db/me"
+
+
+def test_async_reads_match_sync_reads():
+    for path in ["/skills/top", "/projects?q=python", "/search?q=unity", "/by-category/ar"]:
+        sync_response = sync_client.get(path)
+        async_response = async_client.get(path)
+        assert async_response.status_code == sync_response.status_code == 200
+        assert async_response.json() == sync_response.json()
+
+
+def test_async_by_category_not_found():
+    assert async_client.get("/by-category/does-not-exist").status_code == 404
+
+
+def test_async_export_matches_sync_export():
+    for path in ["/export", "/export/projects"]:
+        assert async_client.get(path).text == sync_client.get(path).text
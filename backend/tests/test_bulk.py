@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app import crud, models
+from app.cache import data_version
+from app.main import app
+
+from conftest import ADMIN_AUTH
+
+client = TestClient(app)
+
+
+def test_bulk_endpoints_require_auth(empty_db):
+    assert client.post("/skills/bulk", json=[{"name": "Rust"}]).status_code == 401
+
+
+def test_bulk_skills_upsert_reports_each_item(empty_db):
+    first = client.post("/skills/bulk", auth=ADMIN_AUTH, json=[{"name": "Rust"}, {"name": "Go", "is_top_skill": True}])
+    assert first.status_code == 200
+    assert first.json()["created"] == 2
+
+    version = data_version.value
+    second = client.post("/skills/bulk", auth=ADMIN_AUTH, json=[
+        {"name": "Rust", "is_top_skill": True}, {"name": "Go", "is_top_skill": True}, {"name": "Rust", "is_top_skill": True},
+    ]).json()
+    assert [r["status"] for r in second["results"]] == ["duplicate", "unchanged", "updated"]
+    assert second["results"][0]["id"] == second["results"][2]["id"]
+    assert data_version.value > version
+
+
+def test_bulk_projects_resolve_names_and_replace_links(empty_db):
+    payload = [
+        {"title": "Tracer", "description": "A path tracer", "links": {"github": "https://example.com/tracer"},
+         "skills": ["Rust", "Vulkan"], "categories": ["Graphics"]},
+        {"title": "Notes", "description": "Markdown notes", "skills": ["Rust"], "categories": []},
+    ]
+    response = client.post("/projects/bulk", auth=ADMIN_AUTH, json=payload)
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+    payload[0]["skills"] = ["C++"]
+    assert client.post("/projects/bulk", auth=ADMIN_AUTH, json=payload[:1]).json()["updated"] == 1
+
+    with empty_db() as db:
+        tracer = db.query(models.Project).filter_by(title="Tracer").one()
+        assert [s.name for s in tracer.skills] == ["C++"]
+        assert [c.name for c in tracer.categories] == ["Graphics"]
+        assert tracer.links == {"github": "https://example.com/tracer"}
+        assert db.query(models.Skill).count() == 3
+
+    assert [p["title"] for p in client.get("/projects?q=c%2B%2B").json()] == ["Tracer"]
+
+
+def test_bulk_categories(empty_db):
+    result = client.post("/categories/bulk", auth=ADMIN_AUTH, json=[{"name": "Graphics"}, {"name": "Graphics"}]).json()
+    assert [r["status"] for r in result["results"]] == ["duplicate", "created"]
+
+
+def test_project_titles_are_unique(empty_db):
+    # the bulk upsert is keyed on the title, so two rows may never share one
+    with empty_db() as db:
+        db.add_all([models.Project(title="Tracer", description="one"), models.Project(title="Tracer", description="two")])
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+def test_bulk_projects_report_unchanged(empty_db):
+    payload = [{"title": "Tracer", "description": "A path tracer", "skills": ["Rust"], "categories": ["Graphics"]}]
+    client.post("/projects/bulk", auth=ADMIN_AUTH, json=payload)
+    version = data_version.value
+    again = client.post("/projects/bulk", auth=ADMIN_AUTH, json=payload).json()
+    assert (again["created"], again["updated"], again["unchanged"]) == (0, 0, 1)
+    assert data_version.value == version
+
+    payload[0]["categories"] = ["Rendering"]
+    assert client.post("/projects/bulk", auth=ADMIN_AUTH, json=payload).json()["updated"] == 1
+
+
+def test_bulk_projects_survive_a_concurrent_insert(empty_db, monkeypatch):
+    linked_names = crud._linked_names
+
+    def another_import_commits_first(db, *args):
+        # lands between the title lookup and the insert, as a concurrent request would
+        if args[0] is models.project_skills:
+            with empty_db() as other:
+                other.add(models.Project(title="Tracer", description="theirs", skills=[models.Skill(name="C++")]))
+                other.commit()
+        return linked_names(db, *args)
+
+    monkeypatch.setattr(crud, "_linked_names", another_import_commits_first)
+    response = client.post("/projects/bulk", auth=ADMIN_AUTH, json=[
+        {"title": "Tracer", "description": "ours", "skills": ["Rust"]},
+    ])
+    assert response.status_code == 200
+    with empty_db() as db:
+        tracer = db.query(models.Project).filter_by(title="Tracer").one()
+        assert (tracer.description, [s.name for s in tracer.skills]) == ("ours", ["Rust"])
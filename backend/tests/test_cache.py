@@ -0,0 +1,105 @@
+import os
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from fastapi.testclient import TestClient
+
+from app import models
+from app.cache import DataVersion, Snapshot, track_writes
+from app.database import Base
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_profile_is_served_from_snapshot():
+    first = client.get("/profile")
+    second = client.get("/profile")
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert first.content == second.content
+    assert first.json()["name"]
+
+
+def test_snapshot_rebuilds_after_version_bump():
+    version = DataVersion()
+    snapshot = Snapshot(version)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b"%d" % len(builds)
+
+    assert snapshot.get(build) == b"1"
+    assert snapshot.get(build) == b"1"
+    version.bump()
+    assert snapshot.get(build) == b"2"
+
+
+def test_commit_with_writes_bumps_version():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    version = DataVersion()
+    track_writes(factory, version)
+
+    with factory() as db:
+        db.query(models.Skill).all()
+        db.commit()
+    assert version.value == 0
+
+    with factory() as db:
+        db.add(models.Skill(name="Rust", is_top_skill=False))
+        db.commit()
+    assert version.value == 1
+
+
+def test_shared_version_is_seen_by_every_worker(tmp_path):
+    first, second = DataVersion(), DataVersion()
+    first.share(str(tmp_path / "version"))
+    second.share(str(tmp_path / "version"))
+    assert first.etag == second.etag
+
+    second.bump()
+    assert first.value == second.value == 1
+    assert first.etag == second.etag
+    assert first.updated_at == second.updated_at
+
+
+def test_shared_snapshot_is_built_once(tmp_path):
+    version = DataVersion()
+    version.share(str(tmp_path / "version"))
+    builder, reader = Snapshot(version), Snapshot(version)
+    builder.share(str(tmp_path / "profile"))
+    reader.share(str(tmp_path / "profile"))
+
+    assert builder.get(lambda: b"built") == b"built"
+    assert reader.get(lambda: b"rebuilt") == b"built"
+
+    version.bump()
+    assert reader.current() is None
+
+
+def test_concurrent_stores_leave_a_whole_snapshot(tmp_path):
+    snapshot = Snapshot(DataVersion())
+    snapshot.share(str(tmp_path / "profile"))
+    bodies = [bytes([i]) * 1_000_000 for i in range(16)]
+    errors = []
+
+    def store(body):
+        try:
+            snapshot.store(0, body)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store, args=(body,)) for body in bodies]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with open(tmp_path / "profile", "rb") as f:
+        assert f.read()[8:] in bodies
+    assert os.listdir(tmp_path) == ["profile"]
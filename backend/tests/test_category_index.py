@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from app.category_index import CategoryIndex, normalize, slugify
+from app.main import app
+from app import schemas
+
+from conftest import ADMIN_AUTH
+
+client = TestClient(app)
+
+
+def _index(names):
+    categories = {i: schemas.Category(id=i, name=name) for i, name in enumerate(names, 1)}
+    return CategoryIndex(categories, {}, ({}, {}), [])
+
+
+def test_normalize_and_slugify():
+    assert normalize("  Backend   and AI ") == "backend and ai"
+    assert slugify("AR/VR Development") == "ar-vr-development"
+    assert slugify(".NET Development") == "net-development"
+
+
+def test_match_keeps_substring_semantics_and_accepts_slugs():
+    index = _index(["AR/VR Development", ".NET Development", "Backend and AI", "AI"])
+    assert index.match("dev") == {1, 2}
+    assert index.match("DEVELOPMENT") == {1, 2}
+    # an exact name still selects every category containing it
+    assert index.match("AI") == {3, 4}
+    assert index.match("backend-and-ai") == {3}
+    assert index.match("ar-vr") == {1}
+    assert index.match("quantum") == frozenset()
+
+
+def test_by_category_sees_writes(empty_db):
+    assert client.get("/by-category/Graphics").status_code == 404
+    client.post("/projects/bulk", auth=ADMIN_AUTH, json=[
+        {"title": "Tracer", "description": "A path tracer", "skills": ["Rust"], "categories": ["Graphics"]},
+    ])
+    response = client.get("/by-category/graphics")
+    assert response.status_code == 200
+    [project] = response.json()["projects"]
+    assert project["title"] == "Tracer"
+    assert [s["name"] for s in project["skills"]] == ["Rust"]
+    assert [c["name"] for c in project["categories"]] == ["Graphics"]
+    assert response.json()["work_experience"] == []
+
+
+def test_by_category_matches_work_experience():
+    body = client.get("/by-category/Backend").json()
+    assert [p["title"] for p in body["projects"]] == ["Web Scraper & RAG Chatbot"]
+    assert [w["company"] for w in body["work_experience"]] == ["EdCIL (India) Limited (Ministry of Education, GoI)"]
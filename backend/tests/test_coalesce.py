@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.cache import DataVersion
+from app.coalesce import CoalescingMiddleware
+from app.compression import CompressionMiddleware
+from app.instrumentation import Metrics
+
+
+def _app(version):
+    calls = []
+    api = FastAPI()
+
+    @api.get("/search")
+    def search(q: str, page: int = 1):
+        calls.append((q, page, threading.get_ident()))
+        time.sleep(0.05)
+        return {"q": q, "page": page, "filler": "x" * 1000}
+
+    @api.get("/skills/top")
+    async def top():
+        calls.append(("top",))
+        await asyncio.sleep(0.05)
+        return ["Python"]
+
+    @api.get("/health")
+    def health():
+        calls.append(("health",))
+        return {}
+
+    metrics = Metrics()
+    app = CompressionMiddleware(CoalescingMiddleware(api, routes=("/search", "/skills/"), version=version, metrics=metrics))
+    return app, calls, metrics
+
+
+async def _gather(app, requests):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(path, headers=headers) for path, headers in requests))
+
+
+def test_identical_reads_share_one_run():
+    app, calls, metrics = _app(DataVersion())
+    responses = asyncio.run(_gather(app, [
+        ("/search?q=rust&page=2", {}), ("/search?page=2&q=rust", {}), ("/search?q=rust&page=2", {}),
+        ("/skills/top", {}), ("/skills/top", {}),
+        ("/search?q=go", {}),
+        ("/health", {}), ("/health", {}),
+    ]))
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json() == responses[1].json() == responses[2].json()
+    assert sorted(c[0] for c in calls) == ["go", "health", "health", "rust", "top"]
+    assert metrics.coalescing == {
+        ("/search", "executed"): 2, ("/search", "coalesced"): 2,
+        ("/skills/", "executed"): 1, ("/skills/", "coalesced"): 1,
+    }
+    assert 'http_coalesced_requests_total{route="/search",result="coalesced"} 2' in metrics.render()
+
+
+def test_followers_get_their_own_headers():
+    # the outer compression middleware rewrites headers per client; a shared copy would be encoded twice
+    app, calls, _ = _app(DataVersion())
+    plain, gzipped, gzipped_too = asyncio.run(_gather(app, [
+        ("/search?q=rust", {"Accept-Encoding": "identity"}),
+        ("/search?q=rust", {"Accept-Encoding": "gzip"}),
+        ("/search?q=rust", {"Accept-Encoding": "gzip"}),
+    ]))
+    assert len(calls) == 2
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == gzipped_too.headers["content-encoding"] == "gzip"
+    assert plain.json() == gzipped.json() == gzipped_too.json()
+
+
+def test_a_write_starts_a_new_flight():
+    version = DataVersion()
+    app, calls, _ = _app(version)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/search?q=rust"))
+            await asyncio.sleep(0.01)
+            version.bump()
+            await asyncio.gather(first, client.get("/search?q=rust"))
+
+    asyncio.run(run())
+    assert len(calls) == 2
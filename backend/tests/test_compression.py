@@ -0,0 +1,46 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, negotiate
+from app.main import app
+from app.responses import FastJSONResponse
+
+client = TestClient(app)
+
+
+def test_negotiate_respects_quality_values():
+    assert negotiate("gzip") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate("gzip;q=0, deflate") is None
+
+
+def test_profile_is_served_precompressed_with_variant_etag():
+    plain = client.get("/profile", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/profile", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert compressed.json() == plain.json()
+    assert client.get("/profile", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]}).status_code == 304
+
+
+def test_small_responses_are_not_compressed():
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_responses_are_compressed_incrementally():
+    streaming = FastAPI()
+    streaming.add_middleware(CompressionMiddleware, minimum_size=0)
+
+    @streaming.get("/lines")
+    def lines():
+        return StreamingResponse((f"line {i}\n" for i in range(1000)), media_type="text/plain")
+
+    response = TestClient(streaming).get("/lines", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.count("\n") == 1000
+
+
+def test_fast_json_response_renders_compact_json():
+    assert FastJSONResponse({"a": [1, "é"]}).body == '{"a":[1,"é"]}'.encode()
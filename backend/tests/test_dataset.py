@@ -0,0 +1,18 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from dataset import build_database
+
+
+def test_benchmark_dataset_builds_at_scale(tmp_path):
+    # the benchmarks' 10k scale must still satisfy the schema's constraints
+    path = tmp_path / "bench.db"
+    build_database(str(path), 10000)
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT count(*), count(DISTINCT title) FROM projects").fetchone() == (10000, 10000)
+    finally:
+        conn.close()
@@ -0,0 +1,106 @@
+import json
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import export
+from app.database import SessionLocal
+from app.main import app
+from app.seed import load_ndjson
+
+client = TestClient(app)
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _export(session, **kwargs):
+    return b"".join(export.stream(session, **kwargs)).decode()
+
+
+def test_export_lists_every_entity_in_dependency_order():
+    records = _lines(client.get("/export"))
+    types = [r["type"] for r in records]
+    assert types == sorted(types, key=list(export.ENTITIES).index)
+    project = next(r for r in records if r["type"] == "projects")
+    assert {"id", "title", "description", "links", "skills", "categories"} <= set(project)
+    assert project["skills"] and all(isinstance(name, str) for name in project["skills"])
+
+
+def test_export_entity_and_unknown_entity():
+    skills = _lines(client.get("/export/skills"))
+    assert skills and {r["type"] for r in skills} == {"skills"}
+    assert client.get("/export/passwords").status_code == 422
+
+
+def test_export_round_trips_through_seed_loader(empty_db):
+    original = _export(SessionLocal())
+    assert _export(SessionLocal(), batch_size=1) == original
+
+    conn = empty_db.kw["bind"].raw_connection()
+    try:
+        assert load_ndjson(conn, original.splitlines(), batch_size=7) == len(original.splitlines())
+        conn.commit()
+    finally:
+        conn.close()
+    assert client.get("/export").text == original
+
+
+def test_seed_loader_matches_fields_by_name(empty_db):
+    lines = [
+        '{"type": "links", "id": 1, "name": "GitHub", "url": "https://github.com/me"}',
+        '{"type": "links", "url": "https://example.com", "name": "Blog", "id": 2}',
+    ]
+    conn = empty_db.kw["bind"].raw_connection()
+    try:
+        load_ndjson(conn, lines)
+        assert conn.execute("SELECT name, url FROM links ORDER BY id").fetchall() == [
+            ("GitHub", "https://github.com/me"), ("Blog", "https://example.com"),
+        ]
+        with pytest.raises(ValueError, match="line 2: links fields"):
+            load_ndjson(conn, [lines[0], '{"type": "links", "id": 3, "name": "Site"}'])
+    finally:
+        conn.close()
+
+
+def test_export_reads_one_snapshot(empty_db):
+    conn = empty_db.kw["bind"].raw_connection()
+    try:
+        conn.execute("INSERT INTO links (name, url) VALUES ('GitHub', 'https://github.com/me')")
+        conn.commit()
+        chunks = export.stream(empty_db(), ["links", "skills"])
+        assert b"GitHub" in next(chunks)
+        # committed after the export started, so it is not part of it
+        conn.execute("INSERT INTO skills (name, is_top_skill) VALUES ('Zig', 0)")
+        conn.commit()
+        assert list(chunks) == []
+    finally:
+        conn.close()
+
+
+def test_export_memory_does_not_grow_with_table_size(empty_db):
+    conn = empty_db.kw["bind"].raw_connection()
+    try:
+        conn.execute("INSERT INTO skills (id, name, is_top_skill) VALUES (1, 'Python', 1)")
+        conn.executemany("INSERT INTO projects (id, title, description, links) VALUES (?, ?, ?, '{}')",
+                         [(i, f"project {i}", "x" * 2000) for i in range(1, 3001)])
+        conn.executemany("INSERT INTO project_skills VALUES (?, 1)", [(i,) for i in range(1, 3001)])
+        conn.commit()
+    finally:
+        conn.close()
+
+    tracemalloc.start()
+    try:
+        size = 0
+        for chunk in export.stream(empty_db(), ["projects"], batch_size=100):
+            size += len(chunk)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert size > 6_000_000
+    # a few batches of ~200 KB in flight, never the whole 6 MB
+    assert peak < 2_000_000
@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+from app.cache import data_version
+from app.compression import base_etag
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_read_routes_carry_validators():
+    response = client.get("/projects")
+    assert response.status_code == 200
+    assert base_etag(response.headers["etag"]) == data_version.etag
+    assert "last-modified" in response.headers
+    assert response.headers["cache-control"].startswith("public")
+
+
+def test_if_none_match_returns_304_until_data_changes():
+    etag = client.get("/skills/top").headers["etag"]
+    not_modified = client.get("/skills/top", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    data_version.bump()
+    assert client.get("/skills/top", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_modified_since_returns_304():
+    last_modified = client.get("/search?q=unity").headers["last-modified"]
+    assert client.get("/search?q=unity", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_unlisted_routes_are_not_cached():
+    response = client.get("/health")
+    assert "etag" not in response.headers
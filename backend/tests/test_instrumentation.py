@@ -0,0 +1,65 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from app.cache import data_version
+from app.instrumentation import metrics
+from app.main import app
+from conftest import ADMIN_AUTH
+
+client = TestClient(app)
+
+
+def _queries(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def test_server_timing_reports_queries():
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert _queries(response) == 1
+
+
+def test_profile_and_category_query_counts():
+    # guards against N+1 regressions: the counts must not grow with the number of rows
+    data_version.bump()
+    assert _queries(client.get("/profile")) <= 6
+    assert _queries(client.get("/profile")) == 0
+    client.get("/by-category/Backend")
+    # once the category index is built: one primary-key fetch for a hit, nothing for a miss
+    assert _queries(client.get("/by-category/Backend")) <= 1
+    assert _queries(client.get("/by-category/no-such-category")) == 0
+    # the skill routes are answered from the skill graph alone
+    client.get("/skills/top")
+    assert _queries(client.get("/skills/top")) == 0
+    assert _queries(client.get("/skills/Python/projects")) == 0
+    assert _queries(client.get("/skills/stats")) == 0
+
+
+def test_metrics_exposes_route_histograms():
+    metrics.reset()
+    client.get("/health/db")
+    client.get("/by-category/no-such-category")
+    client.get("/nowhere")
+
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health/db",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/by-category/{category_name}",status="404"} 1' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/health/db"} 1' in body
+    assert 'db_queries_total{method="GET",route="/health/db"} 1' in body
+
+
+def test_profiler_requires_admin():
+    assert client.get("/skills/top?profile=1").status_code == 401
+    assert client.get("/skills/top?profile=1", auth=("admin", "wrong")).status_code == 401
+
+
+def test_profiler_report():
+    response = client.get("/projects?profile=1", auth=ADMIN_AUTH)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text.startswith("GET /projects -> 200")
+    assert "function calls" in response.text
+    assert "crud.py" in response.text
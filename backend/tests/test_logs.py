@@ -0,0 +1,49 @@
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.logs import JSONFormatter, Sampler
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord({
+        "name": "app.access", "levelname": "INFO", "msg": "GET %s", "args": ("/profile",),
+        "route": "/profile", "status": 200, "request_id": "abc",
+    })
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "GET /profile"
+    assert entry["logger"] == "app.access"
+    assert entry["route"] == "/profile"
+    assert entry["status"] == 200
+    assert entry["request_id"] == "abc"
+    assert entry["ts"].endswith("Z")
+
+
+def test_sampler_keeps_errors():
+    sampler = Sampler({"/health": 0.0})
+    assert not sampler.keep("/health", 200)
+    assert sampler.keep("/health", 500)
+    assert sampler.keep("/profile", 200)
+
+
+def test_access_log_carries_request_id(caplog):
+    caplog.set_level(logging.INFO, logger="app.access")
+    response = client.get("/projects?limit=1", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+
+    record = next(r for r in caplog.records if r.name == "app.access")
+    assert record.request_id == "req-123"
+    assert record.route == "/projects"
+    assert record.status == 200
+    assert record.db_queries == 3
+    assert record.duration_ms >= 0
+
+
+def test_request_id_is_generated():
+    first = client.get("/health").headers["x-request-id"]
+    second = client.get("/health").headers["x-request-id"]
+    assert first and first != second
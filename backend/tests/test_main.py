@@ -3,19 +3,67 @@ from app.main import app
 
 client = TestClient(app)
 
+
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
+
 def test_get_top_skills_unseeded():
     response = client.get("/skills/top")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
+
 def test_search_endpoint():
     response = client.get("/search?q=python")
     assert response.status_code == 200
     data = response.json()
     assert "projects" in data
-    assert "skills" in data
\ No newline at end of file
+    assert "skills" in data
+
+
+def test_database_health_reports_pool():
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["checked_out"] == 0
+    assert data["overflow"] == 0
+
+
+def test_sqlite_pragmas_applied_on_connect():
+    from app.database import engine
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+
+def _walk_projects(path):
+    ids, cursor = [], None
+    while True:
+        response = client.get(path + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        ids += [p["id"] for p in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return ids, response
+
+
+def test_projects_cursor_pagination_walks_every_project():
+    ids, last = _walk_projects("/projects?limit=1&total=true")
+    assert ids == sorted(set(ids))
+    assert len(ids) == int(last.headers["x-total-count"])
+
+
+def test_projects_cursor_pagination_with_like_fallback(monkeypatch):
+    from app import search
+    ranked_ids, _ = _walk_projects("/projects?q=python&limit=1")
+    monkeypatch.setattr(search, "enabled", False)
+    like_ids, _ = _walk_projects("/projects?q=python&limit=1")
+    assert sorted(ranked_ids) == like_ids
+
+
+def test_projects_rejects_invalid_cursor():
+    assert client.get("/projects?cursor=not-a-cursor").status_code == 400
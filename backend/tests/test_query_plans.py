@@ -0,0 +1,73 @@
+import re
+import sqlite3
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.cache import data_version
+from app.database import Base, engine
+from app.main import app
+from conftest import SCHEMA
+
+client = TestClient(app)
+
+# tables that grow with the portfolio; skills and categories are small vocabularies
+LARGE_TABLES = {"projects", "project_skills", "project_categories", "work_experience", "work_experience_categories"}
+
+REQUESTS = [
+    "/profile", "/skills/top", "/projects", "/projects?q=python", "/search?q=unity",
+    "/by-category/Backend", "/by-category/no-such-category", "/skills/stats", "/skills/Python/projects",
+]
+
+
+def _statements(paths):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    # on the Engine class, so the statements are seen whichever engine the endpoints read from
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        data_version.bump()
+        for path in paths:
+            assert client.get(path).status_code in (200, 404)
+        # a cursor page filters on the sort key instead of reading from the start
+        cursor = client.get("/projects?limit=1").headers["x-next-cursor"]
+        client.get(f"/projects?limit=1&cursor={cursor}")
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    return statements
+
+
+def _plan(statement, parameters):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+
+def test_filtered_queries_never_scan_large_tables():
+    failures = []
+    statements = _statements(REQUESTS)
+    assert statements, "no statements captured"
+    for statement, parameters in statements:
+        # reading a whole table (the profile, or the first page walking the primary key) is the point of those queries
+        if not re.search(r"\bWHERE\b", statement):
+            continue
+        for step in _plan(statement, parameters):
+            match = re.match(r"SCAN (\w+?)(?:_\d+)?(?: |$)", step)
+            if match and match.group(1) in LARGE_TABLES:
+                failures.append(f"{step}\n    {' '.join(statement.split())[:200]}")
+    assert not failures, "full scans:\n" + "\n".join(failures)
+
+
+def test_schema_and_models_declare_the_same_indexes():
+    conn = sqlite3.connect(":memory:")
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+    in_schema = {name for name, in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex%'"
+    )}
+    in_models = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+    assert in_schema == in_models
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from limits import parse
+
+from app.main import app
+from app.ratelimit import RateLimitMiddleware, SQLiteFixedWindow, create_backend, parse as parse_fast
+
+client = TestClient(app)
+
+
+def test_profile_limit_returns_429_with_retry_after():
+    statuses = [client.get("/profile").status_code for _ in range(11)]
+    assert statuses[:10] == [200] * 10
+    limited = client.get("/profile")
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
+    assert limited.headers["x-ratelimit-limit"] == "10"
+
+
+def test_routes_without_a_limit_are_not_counted():
+    assert all(client.get("/health").status_code == 200 for _ in range(50))
+
+
+@pytest.mark.parametrize("uri", ["memory://", "sqlite:///{tmp}/limits.db", "async+memory://"])
+def test_backends_share_one_fixed_window(uri, tmp_path):
+    uri = uri.format(tmp=tmp_path)
+    limited = FastAPI()
+
+    @limited.get("/search")
+    def search():
+        return {}
+
+    # two middleware instances on one backend stand in for two workers on one store
+    backend = create_backend(uri)
+    limits = {"/search": parse("3/minute")}
+    workers = [TestClient(RateLimitMiddleware(limited, backend=backend, limits=limits)) for _ in range(2)]
+    statuses = [workers[i % 2].get("/search").status_code for i in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+
+
+def test_sqlite_backend_prunes_expired_windows(tmp_path):
+    backend = SQLiteFixedWindow(str(tmp_path / "limits.db"))
+    conn = sqlite3.connect(tmp_path / "limits.db")
+    conn.execute("INSERT INTO rate_limits VALUES ('gone:/search:3/60', 3, 0)")
+    conn.commit()
+    asyncio.run(backend.hit("client:/search:3/60", parse("3/minute")))
+    assert [key for key, in conn.execute("SELECT key FROM rate_limits")] == ["client:/search:3/60"]
+    conn.close()
+
+
+def test_sqlite_backend_fails_open_when_locked(tmp_path):
+    backend = SQLiteFixedWindow(str(tmp_path / "limits.db"))
+    holder = sqlite3.connect(tmp_path / "limits.db", isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        count, _ = asyncio.run(backend.hit("client:/search:3/60", parse("3/minute")))
+        assert count == 0
+        assert time.monotonic() - started < 1
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+
+
+@pytest.mark.parametrize("value", ["10/minute", "30 per minute", "5/2 hours", "1/second", "100/day"])
+def test_parse_matches_limits(value):
+    limit, reference = parse_fast(value), parse(value)
+    assert (limit.amount, limit.get_expiry(), str(limit)) == (reference.amount, reference.get_expiry(), str(reference))
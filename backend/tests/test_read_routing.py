@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database
+from app.cache import data_version
+from app.database import create_db_engine, read_url, reads_from_primary
+from app.main import app, getDataBase, getReadDataBase
+
+from conftest import ADMIN_AUTH, SCHEMA
+
+client = TestClient(app)
+
+
+def test_read_url():
+    assert read_url("sqlite:////srv/a b/me.db", "") == "sqlite:///file:/srv/a%20b/me.db?mode=ro&uri=true"
+    assert read_url("sqlite://", "") is None
+    assert read_url("postgresql://u:p@primary/me", "") is None
+    assert read_url("postgresql://u:p@primary/me", "postgresql://u:p@replica/me") == "postgresql://u:p@replica/me"
+
+
+def test_read_engine_sees_commits_but_refuses_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'me.db'}"
+    primary, reader = create_db_engine(url), create_db_engine(read_url(url))
+    with primary.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(exc.OperationalError, match="readonly"):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+    reader.dispose()
+    primary.dispose()
+
+
+def test_gets_use_the_reader_and_writes_the_primary():
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        calls = {dependant.call for dependant in route.dependant.dependencies}
+        if "GET" in route.methods:
+            assert getDataBase not in calls, route.path
+        elif calls & {getDataBase, getReadDataBase}:
+            assert getDataBase in calls and getReadDataBase not in calls, route.path
+
+
+class _Version:
+    updated_at = 0.0
+
+
+def test_reads_go_to_the_primary_right_after_a_write(monkeypatch):
+    _Version.updated_at = time.time()
+    assert not reads_from_primary(_Version)
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 5)
+    assert reads_from_primary(_Version)
+    _Version.updated_at -= 10
+    assert not reads_from_primary(_Version)
+
+
+def test_a_replica_reads_from_the_primary_after_a_write_by_default(tmp_path):
+    code = "from app import database; print(database.READ_YOUR_WRITES_SECONDS)"
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for replica, seconds in (("", "0.0"), (f"sqlite:///{tmp_path / 'replica.db'}", "5.0")):
+        env = {k: v for k, v in os.environ.items() if k != "DB_READ_YOUR_WRITES_SECONDS"}
+        out = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True,
+                             env=dict(env, DATABASE_READ_URL=replica), check=True).stdout
+        assert out.strip() == seconds
+
+
+def test_admin_reads_its_own_write(empty_db):
+    created = client.post("/skills", json={"name": "Zig", "is_top_skill": True}, auth=ADMIN_AUTH)
+    assert created.status_code == 201
+    assert [skill["name"] for skill in client.get("/skills/top").json()] == ["Zig"]
+
+
+def test_caches_are_built_from_the_primary_when_the_replica_lags(tmp_path):
+    engines = {}
+    for name in ("primary", "replica"):
+        conn = sqlite3.connect(tmp_path / f"{name}.db")
+        with open(SCHEMA) as f:
+            conn.executescript(f.read())
+        conn.commit()
+        conn.close()
+        engines[name] = create_db_engine(f"sqlite:///{tmp_path / name}.db")
+    with engines["primary"].begin() as conn:
+        conn.execute(text("INSERT INTO skills (name, is_top_skill) VALUES ('Zig', 1)"))
+        conn.execute(text("INSERT INTO categories (name) VALUES ('Systems')"))
+
+    replica = sessionmaker(bind=engines["replica"], info={"primary": engines["primary"]})
+    data_version.bump()
+    try:
+        with replica() as db:
+            assert [skill.name for skill in crud.get_top_skills(db)] == ["Zig"]
+            assert crud.current_index(db).match("systems")
+    finally:
+        data_version.bump()
+        for engine in engines.values():
+            engine.dispose()
@@ -0,0 +1,23 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, schemas
+from app.database import Base
+
+
+def test_projects_from_orm_decodes_links_without_touching_rows():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([
+            models.Project(title="Tracer", description="A path tracer", links={"github": "https://example.com"}),
+            models.Project(title="Notes", description="No links yet", links=None),
+        ])
+        db.commit()
+        rows = db.query(models.Project).order_by(models.Project.id).all()
+
+        projects = schemas.projects_from_orm(rows)
+
+        assert [p.links for p in projects] == [{"github": "https://example.com"}, {}]
+        assert rows[1].links is None
+        assert not db.dirty
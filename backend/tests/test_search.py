@@ -0,0 +1,40 @@
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from app import search
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_match_expression_quotes_prefix_terms():
+    assert search.match_expression("C++ unity", search.TAXONOMY_COLUMNS) == '{skills categories} : ("c++"* "unity"*)'
+    assert search.match_expression("  ", search.TEXT_COLUMNS) is None
+
+
+def test_projects_query_matches_skill_prefix():
+    projects = client.get("/projects?q=pyth").json()
+    assert projects
+    assert all(any(s["name"] == "Python" for s in p["skills"]) for p in projects)
+
+
+def test_search_falls_back_to_like_when_fts_disabled(monkeypatch):
+    with_fts = client.get("/search?q=unity").json()
+    monkeypatch.setattr(search, "enabled", False)
+    without_fts = client.get("/search?q=unity").json()
+    assert {p["id"] for p in with_fts["projects"]} == {p["id"] for p in without_fts["projects"]}
+
+
+def test_triggers_keep_index_in_sync():
+    conn = sqlite3.connect(":memory:")
+    with open("app/schema.sql") as f:
+        conn.executescript(f.read())
+    assert search.install(conn)
+    conn.execute("INSERT INTO projects (title, description) VALUES ('Tracer', 'A path tracer')")
+    conn.execute("INSERT INTO skills (name) VALUES ('Vulkan')")
+    conn.execute("INSERT INTO project_skills (project_id, skill_id) VALUES (1, 1)")
+    conn.execute("UPDATE skills SET name = 'Metal' WHERE id = 1")
+    assert conn.execute("SELECT skills FROM project_search WHERE rowid = 1").fetchone() == ("Metal",)
+    conn.execute("DELETE FROM projects WHERE id = 1")
+    assert conn.execute("SELECT count(*) FROM project_search").fetchone() == (0,)
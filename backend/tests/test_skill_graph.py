@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app import warmup
+from app.cache import data_version
+from app.main import app
+from app.skill_graph import SkillGraph, skill_graph_snapshot
+from app import schemas
+
+from conftest import ADMIN_AUTH
+
+client = TestClient(app)
+
+
+def _graph():
+    skills = {
+        1: schemas.Skill(id=1, name="Python", is_top_skill=True),
+        2: schemas.Skill(id=2, name="C++", is_top_skill=False),
+        3: schemas.Skill(id=3, name="Rust", is_top_skill=False),
+    }
+    return SkillGraph(skills, {10: "Engine", 11: "Scraper"}, [(11, 1), (10, 2), (10, 1)])
+
+
+def test_graph_adjacency_and_stats():
+    graph = _graph()
+    assert graph.top_skills == [graph.skills[1]]
+    assert [(s.name, s.project_count) for s in graph.stats] == [("Python", 2), ("C++", 1), ("Rust", 0)]
+
+    python = graph.projects_for("  python ")
+    assert [(p.id, p.title, p.skills) for p in python.projects] == [(10, "Engine", ["Python", "C++"]), (11, "Scraper", ["Python"])]
+    assert graph.projects_for("Rust").projects == []
+
+
+def test_skill_routes(empty_db):
+    client.post("/projects/bulk", auth=ADMIN_AUTH, json=[
+        {"title": "Tracer", "description": "A path tracer", "skills": ["Rust", "Vulkan"]},
+        {"title": "Notes", "description": "Markdown notes", "skills": ["Rust"]},
+    ])
+    body = client.get("/skills/rust/projects").json()
+    assert body["skill"]["name"] == "Rust"
+    assert [p["title"] for p in body["projects"]] == ["Tracer", "Notes"]
+    assert client.get("/skills/Go/projects").status_code == 404
+
+    stats = {s["name"]: s["project_count"] for s in client.get("/skills/stats").json()}
+    assert stats == {"Rust": 2, "Vulkan": 1}
+    # a write moves the data version, so the next read sees the new edge
+    client.post("/projects/bulk", auth=ADMIN_AUTH, json=[{"title": "Kernel", "description": "An OS", "skills": ["Rust"]}])
+    assert {s["name"]: s["project_count"] for s in client.get("/skills/stats").json()}["Rust"] == 3
+
+
+def test_warmer_rebuilds_after_a_write(empty_db):
+    async def run():
+        task = asyncio.create_task(warmup.keep_warm(empty_db, poll=0.01, refresh=0))
+        try:
+            for _ in range(200):
+                if skill_graph_snapshot.current() is not None:
+                    break
+                await asyncio.sleep(0.01)
+            assert skill_graph_snapshot.current() is not None
+            data_version.bump()
+            assert skill_graph_snapshot.current() is None
+            for _ in range(200):
+                if skill_graph_snapshot.current() is not None:
+                    return
+                await asyncio.sleep(0.01)
+            raise AssertionError("the warmer did not rebuild the graph")
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+def _warm_for(session_factory, seconds=0.2):
+    async def run():
+        task = asyncio.create_task(warmup.keep_warm(session_factory, poll=0.01, refresh=0))
+        await asyncio.sleep(seconds)
+        task.cancel()
+
+    asyncio.run(run())
+
+
+def test_warmer_treats_a_missing_profile_as_warm(empty_db, caplog):
+    _warm_for(empty_db)
+    assert skill_graph_snapshot.current() is not None
+    # the missing row is reported once for the version, not on every poll
+    assert [r.getMessage() for r in caplog.records if r.levelname == "ERROR"] == ["Profile with ID 1 not found in the database."]
+
+
+def test_warmer_logs_a_failure_once_per_version(caplog):
+    def broken():
+        raise RuntimeError("database is down")
+
+    _warm_for(broken)
+    assert len([r for r in caplog.records if r.getMessage() == "Cache warming failed"]) == 1
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import logs
+from app.database import create_db_engine
+from app.main import create_app
+from app.serve import worker_defaults
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_defers_optional_subsystems():
+    code = "import sys, app.main; print(' '.join(sorted(sys.modules)))"
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True,
+                            env=dict(os.environ, LOG_FILE="", DB_ASYNC="0"), check=True).stdout.split()
+    for module in ("limits", "cProfile", "pstats", "sqlalchemy.ext.asyncio", "app.async_api"):
+        assert module not in loaded
+
+
+def test_lifespan_owns_logging(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert logs._listener is None
+    assert logs._queue_handler is None
+    with TestClient(create_app()) as client:
+        assert logs._listener is not None
+        assert client.get("/health").status_code == 200
+    assert logs._listener is None
+    assert logs._queue_handler is None
+
+
+def test_sqlite_directory_created_with_the_engine(tmp_path):
+    path = tmp_path / "nested" / "portfolio.db"
+    engine = create_db_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    engine.dispose()
+    assert path.exists()
+
+
+def test_multi_worker_defaults_share_rate_limits_and_skip_the_log_file():
+    environ = {}
+    worker_defaults(4, "/tmp/me-api-x", environ)
+    assert environ == {"RATE_LIMIT_STORAGE": "sqlite:////tmp/me-api-x/rate_limits.db", "LOG_FILE": ""}
+
+    explicit = {"RATE_LIMIT_STORAGE": "redis://cache:6379", "LOG_FILE": "/var/log/api.log"}
+    worker_defaults(4, "/tmp/me-api-x", explicit)
+    assert explicit == {"RATE_LIMIT_STORAGE": "redis://cache:6379", "LOG_FILE": "/var/log/api.log"}
+
+    single = {}
+    worker_defaults(1, "/tmp/me-api-x", single)
+    assert single == {}